@@ -0,0 +1,186 @@
+"""Fleet risk analytics over stored JHAs
+
+The consequence and likelihood of every stored step are loaded once into flat
+NumPy arrays, with per-JHA location, vessel, work types and creation time kept
+as integer codes. All aggregations are bincounts and matrix products over
+these arrays, so they stay fast over millions of steps.
+"""
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+# get_risk_badge shows risk values above 9 as high
+HIGH_RISK_THRESHOLD = 10
+
+# Dimensions the dashboard can break results down by
+GROUP_BY = ("location", "vessel", "work_type")
+
+
+def _factorize(values):
+    """Map values to integer codes, returning (codes, labels)"""
+    index = {}
+    codes = np.fromiter((index.setdefault(v, len(index)) for v in values), dtype=np.int32, count=len(values))
+    return codes, list(index)
+
+
+@dataclass
+class RiskTable:
+    # Per step
+    consequence: np.ndarray
+    likelihood: np.ndarray
+    jha_index: np.ndarray
+    # Per JHA
+    created: np.ndarray
+    location_codes: np.ndarray
+    vessel_codes: np.ndarray
+    work_type_matrix: np.ndarray
+    # Labels for the codes and work type columns
+    locations: list
+    vessels: list
+    work_types: list
+
+    @classmethod
+    def from_entries(cls, entries):
+        """Build the arrays from JHAStore risk entries (see JHAStore.read_risks_since)"""
+        step_counts = np.fromiter((len(r.consequence) for r in entries), dtype=np.int64, count=len(entries))
+        consequence = np.frombuffer(b"".join(r.consequence for r in entries), dtype=np.int8)
+        likelihood = np.frombuffer(b"".join(r.likelihood for r in entries), dtype=np.int8)
+        jha_index = np.repeat(np.arange(len(entries), dtype=np.int32), step_counts)
+
+        created = np.fromiter((r.created for r in entries), dtype=np.int64, count=len(entries))
+        location_codes, locations = _factorize([r.location or "Not specified" for r in entries])
+        vessel_codes, vessels = _factorize([r.vessel_name or "Unknown" for r in entries])
+
+        work_types = sorted({w for r in entries for w in r.work_types})
+        columns = {w: i for i, w in enumerate(work_types)}
+        work_type_matrix = np.zeros((len(entries), len(work_types)), dtype=bool)
+        for row, entry in enumerate(entries):
+            for work_type in entry.work_types:
+                work_type_matrix[row, columns[work_type]] = True
+
+        return cls(
+            consequence, likelihood, jha_index,
+            created.astype("datetime64[s]"), location_codes, vessel_codes, work_type_matrix,
+            locations, vessels, work_types
+        )
+
+    @property
+    def step_count(self):
+        return len(self.consequence)
+
+    @property
+    def risk(self):
+        return self.consequence.astype(np.int16) * self.likelihood
+
+    def step_mask(self, by, label):
+        """Boolean mask of the steps belonging to one location, vessel or work type"""
+        if by == "location":
+            return self.location_codes[self.jha_index] == self.locations.index(label)
+        if by == "vessel":
+            return self.vessel_codes[self.jha_index] == self.vessels.index(label)
+        if by == "work_type":
+            return self.work_type_matrix[self.jha_index, self.work_types.index(label)]
+        raise ValueError(f"Unknown grouping: {by}")
+
+
+class RiskTableLoader:
+    """Keeps a RiskTable of a JHAStore up to date by reading only what was appended"""
+
+    def __init__(self, store):
+        self.store = store
+        self._entries = {}
+        self._offset = 0
+        self._table = RiskTable.from_entries([])
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Read new records and return the current table; it is rebuilt only when something changed"""
+        with self._lock:
+            entries, self._offset = self.store.read_risks_since(self._offset)
+            if entries:
+                for entry in entries:
+                    # Revisions replace the earlier version of a JHA
+                    self._entries.pop(entry.jha_id, None)
+                    self._entries[entry.jha_id] = entry
+                self._table = RiskTable.from_entries(list(self._entries.values()))
+            return self._table
+
+
+def risk_matrix(table, mask=None):
+    """5x5 count of steps by consequence (rows) and likelihood (columns)"""
+    cells = (table.consequence.astype(np.int32) - 1) * 5 + (table.likelihood - 1)
+    if mask is not None:
+        cells = cells[mask]
+    return np.bincount(cells, minlength=25).reshape(5, 5)
+
+
+def risk_matrices_by(table, by):
+    """5x5 risk matrix for every location, vessel or work type, as (labels, counts[group, 5, 5])"""
+    if by == "work_type":
+        # Work types overlap, so each gets its own masked count
+        matrices = [risk_matrix(table, table.step_mask(by, w)) for w in table.work_types]
+        return table.work_types, np.array(matrices, dtype=np.int64).reshape(-1, 5, 5)
+    if by == "location":
+        codes, labels = table.location_codes, table.locations
+    elif by == "vessel":
+        codes, labels = table.vessel_codes, table.vessels
+    else:
+        raise ValueError(f"Unknown grouping: {by}")
+
+    cells = (table.consequence.astype(np.int64) - 1) * 5 + (table.likelihood - 1)
+    keys = codes[table.jha_index].astype(np.int64) * 25 + cells
+    counts = np.bincount(keys, minlength=len(labels) * 25)
+    return labels, counts.reshape(len(labels), 5, 5)
+
+
+def risk_band_counts(matrices):
+    """Collapse 5x5 risk matrices to low/medium/high step counts, using get_risk_badge's bands"""
+    risk = np.outer(np.arange(1, 6), np.arange(1, 6))
+    bands = np.stack([risk <= 4, (risk > 4) & (risk < HIGH_RISK_THRESHOLD), risk >= HIGH_RISK_THRESHOLD])
+    return np.einsum("gcl,bcl->gb", matrices, bands.astype(np.int64))
+
+
+def high_risk_share_by(table, by):
+    """Share of high-risk steps per location, vessel or work type, as (labels, share, steps)"""
+    high = table.risk >= HIGH_RISK_THRESHOLD
+
+    if by == "work_type":
+        # Reduce to per-JHA totals, then a JHA can count towards several work types
+        jha_count = len(table.created)
+        steps_per_jha = np.bincount(table.jha_index, minlength=jha_count)
+        high_per_jha = np.bincount(table.jha_index, weights=high, minlength=jha_count)
+        matrix = table.work_type_matrix.T.astype(np.float64)
+        steps = matrix @ steps_per_jha
+        high_steps = matrix @ high_per_jha
+        labels = table.work_types
+    else:
+        if by == "location":
+            codes, labels = table.location_codes, table.locations
+        elif by == "vessel":
+            codes, labels = table.vessel_codes, table.vessels
+        else:
+            raise ValueError(f"Unknown grouping: {by}")
+        step_codes = codes[table.jha_index]
+        steps = np.bincount(step_codes, minlength=len(labels))
+        high_steps = np.bincount(step_codes, weights=high, minlength=len(labels))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        share = np.where(steps > 0, high_steps / steps, 0.0)
+    return labels, share, steps.astype(np.int64)
+
+
+def monthly_trend(table):
+    """Steps, mean risk and high-risk share per month, as (months, steps, mean_risk, high_share)"""
+    months, jha_month = np.unique(table.created.astype("datetime64[M]"), return_inverse=True)
+    step_month = jha_month.reshape(-1)[table.jha_index]
+    risk = table.risk
+
+    steps = np.bincount(step_month, minlength=len(months))
+    risk_total = np.bincount(step_month, weights=risk, minlength=len(months))
+    high = np.bincount(step_month, weights=risk >= HIGH_RISK_THRESHOLD, minlength=len(months))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_risk = np.where(steps > 0, risk_total / steps, 0.0)
+        high_share = np.where(steps > 0, high / steps, 0.0)
+    return months, steps, mean_risk, high_share
@@ -0,0 +1,280 @@
+"""Headless HTTP API for creating, revising and exporting JHAs
+
+Run with:
+    python api_server.py --port 8080 --workers 4 --queue-size 32
+
+Endpoints:
+    POST /jha          {"job_description", "work_types", "location"}  -> 202 {"job_id", ...}
+    POST /jha/revise   {"jha", "message", "work_types", "location"}   -> 202 {"job_id", ...}
+    POST /jha/export   {"jha", "vessel_name", "task_name"}            -> 200 .docx document
+    GET  /jobs/<id>    status and result of a create/revise job
+    GET  /health       worker and queue status
+
+Generation and revision run on a bounded worker pool fed from a bounded queue.
+When the queue is full new jobs are rejected with 503 and a Retry-After header.
+"""
+import argparse
+import json
+import queue
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import jha_service
+
+# Largest request body accepted, in bytes
+MAX_BODY_SIZE = 1024 * 1024
+
+# Seconds a finished job is kept for polling
+JOB_TTL = 3600
+
+# Seconds clients are asked to wait after a 503
+RETRY_AFTER = 2
+
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+def create_and_store(job_description, work_types, location):
+    """Generate a JHA and record it in the store behind the fleet dashboard
+
+    Generation raises on failure, so failed jobs never reach the store, where
+    they would count towards the analytics and be offered for reuse.
+    """
+    jha = jha_service.generate_checked_jha(job_description, work_types, location)
+    jha_service.jha_store.save(jha, job_description=job_description, location=location, work_types=work_types)
+    return jha
+
+
+class JobQueue:
+    """Fixed pool of worker threads consuming jobs from a bounded queue"""
+
+    def __init__(self, workers=4, queue_size=32, job_ttl=JOB_TTL):
+        self.workers = workers
+        self.job_ttl = job_ttl
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"jha-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, kind, func, *args):
+        """Queue a job, returning its status or None if the queue is full"""
+        self._purge_expired()
+
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "kind": kind,
+            "status": "queued",
+            "submitted_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None
+        }
+        with self._lock:
+            self._jobs[job["job_id"]] = job
+
+        try:
+            self._queue.put_nowait((job, func, args))
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job["job_id"]]
+            return None
+
+        return dict(job)
+
+    def get(self, job_id):
+        """Get a snapshot of a job, or None if it is unknown or expired"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def pending(self):
+        """Number of jobs waiting for a worker"""
+        return self._queue.qsize()
+
+    def shutdown(self):
+        """Stop the workers once the queued jobs are done"""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            job, func, args = item
+            with self._lock:
+                job["status"] = "running"
+                job["started_at"] = time.time()
+
+            try:
+                result = func(*args)
+                with self._lock:
+                    job["result"] = result
+                    job["status"] = "done"
+            except Exception as e:
+                with self._lock:
+                    job["error"] = str(e)
+                    job["status"] = "failed"
+            finally:
+                with self._lock:
+                    job["finished_at"] = time.time()
+
+    def _purge_expired(self):
+        cutoff = time.time() - self.job_ttl
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job["finished_at"] is not None and job["finished_at"] < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+
+class JHARequestHandler(BaseHTTPRequestHandler):
+    """Routes API requests to the JHA functions in jha_service.py"""
+
+    server_version = "JHAAPI/1.0"
+
+    def do_GET(self):
+        if self.path == "/health":
+            jobs = self.server.jobs
+            self._send_json(200, {"status": "ok", "workers": jobs.workers, "queued": jobs.pending()})
+        elif self.path.startswith("/jobs/"):
+            job = self.server.jobs.get(self.path[len("/jobs/"):])
+            if job is None:
+                self._send_error(404, "Unknown job")
+            else:
+                self._send_json(200, job)
+        else:
+            self._send_error(404, "Not found")
+
+    def do_POST(self):
+        try:
+            body = self._read_json()
+        except ValueError as e:
+            self._send_error(400, str(e))
+            return
+
+        if self.path == "/jha":
+            job_description = body.get("job_description")
+            work_types = body.get("work_types")
+            if not isinstance(job_description, str) or not job_description.strip():
+                self._send_error(400, "job_description is required")
+            elif not isinstance(work_types, list) or not work_types or not all(isinstance(w, str) for w in work_types):
+                self._send_error(400, "work_types must be a non-empty list of strings")
+            else:
+                self._submit("create", create_and_store, job_description, work_types, body.get("location"))
+
+        elif self.path == "/jha/revise":
+            work_types = body.get("work_types", [])
+            if not isinstance(body.get("jha"), dict):
+                self._send_error(400, "jha must be a JHA object")
+            elif not isinstance(body.get("message"), str) or not body["message"].strip():
+                self._send_error(400, "message is required")
+            elif not isinstance(work_types, list) or not all(isinstance(w, str) for w in work_types):
+                self._send_error(400, "work_types must be a list of strings")
+            else:
+                # The revised JHA is validated against the task's work types and location when given
+                self._submit("revise", jha_service.revise_checked_jha, body["jha"], body["message"], work_types, body.get("location"))
+
+        elif self.path == "/jha/export":
+            if not isinstance(body.get("jha"), dict):
+                self._send_error(400, "jha must be a JHA object")
+                return
+            try:
+                doc_bytes = jha_service.create_jha_document(
+                    body["jha"], str(body.get("vessel_name", "")), str(body.get("task_name", ""))
+                )
+            except Exception as e:
+                self._send_error(500, f"Error creating document: {e}")
+            else:
+                self._send(200, DOCX_MIME, doc_bytes)
+
+        else:
+            self._send_error(404, "Not found")
+
+    def _submit(self, kind, func, *args):
+        job = self.server.jobs.submit(kind, func, *args)
+        if job is None:
+            self._send_error(503, "Server busy, retry later", {"Retry-After": str(RETRY_AFTER)})
+        else:
+            self._send_json(202, job, {"Location": f"/jobs/{job['job_id']}"})
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_SIZE:
+            raise ValueError("Request body too large")
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            raise ValueError("Request body must be valid JSON")
+        if not isinstance(body, dict):
+            raise ValueError("Request body must be a JSON object")
+        return body
+
+    def _send(self, status, content_type, data, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, status, payload, headers=None):
+        self._send(status, "application/json", json.dumps(payload).encode("utf-8"), headers)
+
+    def _send_error(self, status, message, headers=None):
+        self._send_json(status, {"error": message}, headers)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def create_server(host="127.0.0.1", port=8080, workers=4, queue_size=32, quiet=False):
+    """Create the API server with its worker pool; call serve_forever() to run it"""
+    server = ThreadingHTTPServer((host, port), JHARequestHandler)
+    server.daemon_threads = True
+    server.jobs = JobQueue(workers=workers, queue_size=queue_size)
+    server.quiet = quiet
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the JHA HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent model calls")
+    parser.add_argument("--queue-size", type=int, default=32, help="Jobs waiting before new ones are rejected")
+    parser.add_argument("--stub-latency", type=float, default=None,
+                        help="Use the local stub model with this delay in seconds instead of Gemini")
+    args = parser.parse_args()
+
+    if args.stub_latency is not None:
+        # The stub also stands in for the instruction-bound model the prefix cache creates
+        import google.generativeai as genai
+        from stub_model import StubModel
+        stub = StubModel(latency=args.stub_latency)
+        genai.GenerativeModel = stub.as_constructor()
+        jha_service.model = stub
+
+    server = create_server(args.host, args.port, args.workers, args.queue_size)
+    print(f"JHA API listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.jobs.shutdown()
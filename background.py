@@ -0,0 +1,57 @@
+"""Background model calls that keep the Streamlit session responsive
+
+Model calls run as asyncio tasks on one event loop in a daemon thread shared
+by all sessions, instead of blocking the script run. Every call has a
+timeout, and cancelling a call cancels its task, which aborts the request in
+flight rather than leaving it to finish unseen.
+"""
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+
+# Default seconds allowed per model call
+MODEL_CALL_TIMEOUT = 120
+
+
+@dataclass(slots=True)
+class ModelCall:
+    """A model call running in the background, with what to do with its result"""
+    kind: str
+    label: str
+    future: object
+    timeout: float
+    context: dict = field(default_factory=dict)
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def done(self):
+        return self.future.done()
+
+    def cancel(self):
+        return self.future.cancel()
+
+    def result(self):
+        """Result of a finished call; raises TimeoutError or the call's exception"""
+        return self.future.result(timeout=0)
+
+
+class BackgroundRunner:
+    """Event loop thread that runs model call coroutines"""
+
+    def __init__(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="model-calls", daemon=True)
+        self._thread.start()
+
+    def submit(self, kind, label, coroutine, timeout=MODEL_CALL_TIMEOUT, **context):
+        """Start a coroutine on the loop, returning its ModelCall"""
+        future = asyncio.run_coroutine_threadsafe(asyncio.wait_for(coroutine, timeout), self._loop)
+        return ModelCall(kind, label, future, timeout, context)
+
+    def close(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
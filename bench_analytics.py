@@ -0,0 +1,98 @@
+"""Benchmark loading the fleet risk table from the JHA store and the aggregations on it
+
+Run with:
+    python bench_analytics.py --steps 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+import analytics
+from jha_model import JHA, Hazard, Step
+from jha_store import JHAStore
+
+LOCATIONS = ["Engine Room", "Pump Room", "Main Deck", "Tank Entry", "Bridge", "Gangway"]
+VESSELS = [f"Vessel {i}" for i in range(40)]
+WORK_TYPES = ["Cold Work", "Critical Equipment", "Critical System", "Enclosed Space Entry",
+              "Hot Work", "LOTO", "Overside", "Working Aloft"]
+
+
+def synthetic_table(steps, steps_per_jha=10, seed=0):
+    rng = np.random.default_rng(seed)
+    jhas = steps // steps_per_jha
+    start = np.datetime64("2020-01-01T00:00:00", "s").astype(np.int64)
+    return analytics.RiskTable(
+        consequence=rng.integers(1, 6, steps, dtype=np.int8),
+        likelihood=rng.integers(1, 6, steps, dtype=np.int8),
+        jha_index=np.repeat(np.arange(jhas, dtype=np.int32), steps_per_jha),
+        created=np.sort(rng.integers(start, start + 5 * 365 * 86400, jhas)).astype("datetime64[s]"),
+        location_codes=rng.integers(0, len(LOCATIONS), jhas, dtype=np.int32),
+        vessel_codes=rng.integers(0, len(VESSELS), jhas, dtype=np.int32),
+        work_type_matrix=rng.random((jhas, len(WORK_TYPES))) < 0.3,
+        locations=LOCATIONS,
+        vessels=VESSELS,
+        work_types=WORK_TYPES
+    )
+
+
+def synthetic_store(path, steps, steps_per_jha=10, seed=0):
+    """Write steps // steps_per_jha synthetic JHAs to a JHA store"""
+    rng = np.random.default_rng(seed)
+    levels = rng.integers(1, 6, (steps // steps_per_jha, steps_per_jha, 2))
+    hazard = Hazard("Moving machinery", "Technicians", "Contact with moving parts")
+    store = JHAStore(path)
+    for i, jha_levels in enumerate(levels):
+        jha = JHA(tuple(
+            Step(f"Task step {k}", hazard, ("Required PPE as per PPE Matrix REF-1412",), int(c), int(l))
+            for k, (c, l) in enumerate(jha_levels)
+        ), ("Work Permit",))
+        store.save(
+            jha,
+            vessel_name=VESSELS[i % len(VESSELS)],
+            location=LOCATIONS[i % len(LOCATIONS)],
+            work_types=(WORK_TYPES[i % len(WORK_TYPES)],),
+            created=1.6e9 + i * 600
+        )
+    return store
+
+
+def timed(label, func, *args):
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed * 1000:8.1f} ms")
+    return elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark fleet risk analytics")
+    parser.add_argument("--steps", type=int, default=1_000_000)
+    parser.add_argument("--skip-store", action="store_true", help="Only time the aggregations")
+    args = parser.parse_args()
+
+    if not args.skip_store:
+        # What the dashboard pays: a full load once per server, then only the appended records
+        with tempfile.TemporaryDirectory() as data_dir:
+            store = synthetic_store(os.path.join(data_dir, "jha_store.bin"), args.steps)
+            loader = analytics.RiskTableLoader(store)
+            timed("Load from store (first run)", loader.refresh)
+            timed("Refresh (nothing new)", loader.refresh)
+            store.save(JHA((Step("New step"),)))
+            timed("Refresh (one new JHA)", loader.refresh)
+            print()
+
+    table = synthetic_table(args.steps)
+    print(f"{table.step_count} steps in {len(table.created)} JHAs")
+
+    total = 0.0
+    total += timed("Risk matrix", analytics.risk_matrix, table)
+    total += timed("Risk matrix (one work type)", lambda: analytics.risk_matrix(table, table.step_mask("work_type", "Hot Work")))
+    total += timed("Risk matrices by location", analytics.risk_matrices_by, table, "location")
+    total += timed("Risk matrices by vessel", analytics.risk_matrices_by, table, "vessel")
+    for by in analytics.GROUP_BY:
+        total += timed(f"High-risk share by {by}", analytics.high_risk_share_by, table, by)
+    total += timed("Monthly trend", analytics.monthly_trend, table)
+    print(f"{'Total':<32} {total * 1000:8.1f} ms")
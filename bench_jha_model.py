@@ -0,0 +1,79 @@
+"""Benchmark dict JHAs against the slotted JHA model
+
+Simulates sessions each holding JHAs parsed from model responses and compares
+memory held and (de)serialization time: dict + JSON against JHA + to_bytes.
+
+Run with:
+    python bench_jha_model.py --sessions 100 --jhas 5
+"""
+import argparse
+import copy
+import json
+import time
+import tracemalloc
+
+from jha_model import JHA
+from stub_model import STUB_JHA
+
+
+def make_responses(count):
+    """Model responses sharing the usual boilerplate with task-specific steps"""
+    responses = []
+    for i in range(count):
+        jha = copy.deepcopy(STUB_JHA)
+        for n in range(8):
+            step = copy.deepcopy(STUB_JHA['steps'][3])
+            step['description'] = f"Task {i} step {n}: dismantle, inspect and reassemble the unit"
+            jha['steps'].append(step)
+        jha['location'] = "Engine Room"
+        responses.append(json.dumps(jha))
+    return responses
+
+
+def measure_memory(build):
+    tracemalloc.start()
+    held = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del held
+    return current
+
+
+def measure_time(func, items, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the JHA data model")
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--jhas", type=int, default=5, help="JHAs held per session")
+    args = parser.parse_args()
+
+    count = args.sessions * args.jhas
+    responses = make_responses(count)
+
+    dict_memory = measure_memory(lambda: [json.loads(r) for r in responses])
+    model_memory = measure_memory(lambda: [JHA.from_dict(json.loads(r)) for r in responses])
+
+    dicts = [json.loads(r) for r in responses]
+    models = [JHA.from_dict(d) for d in dicts]
+    json_blobs = [json.dumps(d).encode("utf-8") for d in dicts]
+    binary_blobs = [m.to_bytes() for m in models]
+
+    json_dump = measure_time(lambda d: json.dumps(d).encode("utf-8"), dicts)
+    binary_dump = measure_time(lambda m: m.to_bytes(), models)
+    json_load = measure_time(json.loads, json_blobs)
+    binary_load = measure_time(JHA.from_bytes, binary_blobs)
+
+    print(f"{args.sessions} sessions x {args.jhas} JHAs ({count} JHAs)")
+    print(f"Memory per JHA:    dict {dict_memory / count:8.0f} B   model {model_memory / count:8.0f} B")
+    print(f"Stored size:       json {sum(map(len, json_blobs)) / count:8.0f} B   "
+          f"binary {sum(map(len, binary_blobs)) / count:8.0f} B")
+    print(f"Serialize per JHA:   json {json_dump / count * 1e6:6.1f} us   binary {binary_dump / count * 1e6:6.1f} us")
+    print(f"Deserialize per JHA: json {json_load / count * 1e6:6.1f} us   binary {binary_load / count * 1e6:6.1f} us")
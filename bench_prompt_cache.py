@@ -0,0 +1,80 @@
+"""Benchmark how the JHA instructions are sent with each generation
+
+Uses the local stub model, whose delay grows with the number of input tokens,
+and compares:
+
+- full prompt: the instructions are part of every prompt
+- system instruction: what create_prefix_model falls back to when the
+  instructions are below CACHE_MIN_TOKENS, as they are today. The API still
+  counts the instructions with every request, so this saves nothing
+- cached content: the factory is swapped for one that binds the instructions
+  once, which is what context caching would give if the instructions were
+  large enough
+
+Run with:
+    python bench_prompt_cache.py --calls 20 --token-latency 0.0002
+"""
+import argparse
+import time
+from unittest import mock
+
+import google.generativeai as genai
+
+import jha_service
+from prompt_cache import PrefixModelCache
+from stub_model import StubModel, count_tokens
+
+TASKS = [
+    ("Replace impeller on FW pump 2", ["LOTO", "Critical Equipment"], "Engine Room"),
+    ("Inspect ballast tank coating", ["Enclosed Space Entry"], "Tank Entry"),
+    ("Weld bracket on forward mast", ["Hot Work", "Working Aloft"], "Forward Mast"),
+    ("Service MOB davit winch", ["Overside", "LOTO"], "MOB"),
+]
+
+
+def run(generate, calls):
+    start = time.perf_counter()
+    for i in range(calls):
+        generate(*TASKS[i % len(TASKS)])
+    return time.perf_counter() - start
+
+
+def report(label, stub, elapsed, calls):
+    print(f"{label:<20} {stub.input_tokens / calls:7.0f} input tokens/call   "
+          f"{elapsed / calls * 1000:7.1f} ms/call   (+{stub.instruction_tokens} tokens once)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the JHA instruction prefix")
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.0, help="Fixed stub delay per call in seconds")
+    parser.add_argument("--token-latency", type=float, default=0.0002, help="Stub delay per input token in seconds")
+    args = parser.parse_args()
+
+    print(f"{args.calls} generations, instructions of {count_tokens(jha_service.JHA_INSTRUCTIONS)} tokens "
+          f"(context caching needs {jha_service.CACHE_MIN_TOKENS})")
+
+    # The instructions are sent with every request
+    full_stub = StubModel(args.latency, args.token_latency)
+    elapsed = run(lambda *task: full_stub.generate_content(
+        jha_service.JHA_INSTRUCTIONS + "\n\n" + jha_service.build_jha_request(*task)
+    ), args.calls)
+    report("Full prompt", full_stub, elapsed, args.calls)
+
+    # generate_jha through create_prefix_model, which falls back to a system instruction
+    system_stub = StubModel(args.latency, args.token_latency)
+    jha_service.model = system_stub
+    with mock.patch.object(genai, "GenerativeModel", system_stub.as_constructor()):
+        jha_service.get_prefix_cache().invalidate()
+        elapsed = run(jha_service.generate_jha, args.calls)
+    report("System instruction", system_stub, elapsed, args.calls)
+
+    # generate_jha with an injected factory standing in for cached content
+    cached_stub = StubModel(args.latency, args.token_latency)
+    jha_service.model = cached_stub
+    cache = PrefixModelCache(
+        jha_service.JHA_INSTRUCTIONS, lambda model, instructions: (model.with_system_instruction(instructions, cached=True), None)
+    )
+    with mock.patch.object(jha_service, "get_prefix_cache", lambda: cache):
+        elapsed = run(jha_service.generate_jha, args.calls)
+    report("Cached content", cached_stub, elapsed, args.calls)
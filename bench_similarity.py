@@ -0,0 +1,63 @@
+"""Benchmark near-duplicate lookups in the MinHash LSH index of past JHAs
+
+Builds an index of synthetic maintenance job descriptions and times queries
+against it, comparing with an exact Jaccard scan over every entry.
+
+Run with:
+    python bench_similarity.py --entries 100000 --queries 1000
+"""
+import argparse
+import random
+import time
+
+from similarity import SimilarityIndex, jaccard, shingles
+
+VERBS = "replace inspect service overhaul clean test calibrate lubricate renew adjust grease align".split()
+PARTS = "impeller seal bearing valve gasket filter coupling belt sensor nozzle piston liner element hose".split()
+EQUIPMENT = [
+    "FW pump", "SW pump", "fuel purifier", "lube oil cooler", "air compressor", "MOB davit winch",
+    "anchor windlass", "mooring winch", "steering gear", "emergency generator", "ballast pump",
+    "bilge pump", "boiler burner", "incinerator", "HVAC unit", "crane slewing gear"
+]
+EXTRAS = ["", "", " and check alignment", " including pressure test", " at port side", " at starboard side"]
+LOCATIONS = ["Engine Room", "Pump Room", "Main Deck", "MOB", "Thruster Room"]
+WORK_TYPES = [["LOTO"], ["LOTO", "Critical Equipment"], ["Hot Work"], ["Working Aloft"], ["Cold Work"]]
+
+
+def job_description(rng):
+    return (f"{rng.choice(VERBS)} {rng.choice(PARTS)} on {rng.choice(EQUIPMENT)} "
+            f"no. {rng.randint(1, 4)}{rng.choice(EXTRAS)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the JHA similarity index")
+    parser.add_argument("--entries", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    entries = [(i, job_description(rng), rng.choice(WORK_TYPES), rng.choice(LOCATIONS)) for i in range(args.entries)]
+    queries = [(job_description(rng), rng.choice(WORK_TYPES), rng.choice(LOCATIONS)) for _ in range(args.queries)]
+
+    index = SimilarityIndex()
+    start = time.perf_counter()
+    for entry in entries:
+        index.add(*entry)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    found = sum(bool(index.query(*query)) for query in queries)
+    query_time = time.perf_counter() - start
+
+    # Exact scan over a sample of the queries, as a baseline
+    scan_queries = queries[:max(1, args.queries // 100)]
+    entry_shingles = [(shingles(desc), set(work_types), location) for _, desc, work_types, location in entries]
+    start = time.perf_counter()
+    for desc, work_types, location in scan_queries:
+        query_shingles = shingles(desc)
+        [jaccard(query_shingles, s) for s, w, loc in entry_shingles if loc == location and w == set(work_types)]
+    scan_time = time.perf_counter() - start
+
+    print(f"{args.entries} indexed JHAs, built in {build_time:.1f}s")
+    print(f"LSH query:  {query_time / args.queries * 1000:8.3f} ms/query  ({found}/{args.queries} with matches)")
+    print(f"Exact scan: {scan_time / len(scan_queries) * 1000:8.3f} ms/query")
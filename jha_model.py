@@ -0,0 +1,227 @@
+"""Typed JHA data model
+
+JHAs are held in session state and storage as slotted dataclasses instead of
+nested dicts. Repeated strings such as the mandatory steps, "PPE Matrix REF-1412"
+and common controls are interned, so every JHA in the process shares one copy.
+Fields the model returns that the data model doesn't know are kept in `extra`
+and written back by to_dict, so revisions and translations don't lose them.
+"""
+import marshal
+import math
+import sys
+from dataclasses import dataclass, field
+
+# Version tag at the start of every serialized JHA; version 1 had no extra fields or risk problems
+FORMAT_VERSION = 2
+
+_STEP_FIELDS = frozenset(("description", "hazards", "controls", "risk_level"))
+_JHA_FIELDS = frozenset(("steps", "permits_required", "special_considerations", "location"))
+
+
+def _text(value):
+    """Coerce a value to an interned string"""
+    if value is None:
+        return ""
+    return sys.intern(value if isinstance(value, str) else str(value))
+
+
+def _texts(value):
+    """Coerce a list (or a single value) to a tuple of interned strings"""
+    if isinstance(value, (list, tuple)):
+        return tuple(_text(item) for item in value)
+    return (_text(value),) if value else ()
+
+
+def _level(value):
+    """Coerce a consequence or likelihood value to an int between 1 and 5, returning (level, problem)
+
+    Fractions round up and out of range values are clamped. Missing values and
+    values that are not finite numbers, such as "High" or Infinity, are taken
+    as 5, the most severe. Anything that was not already a whole number from 1 to 5 is
+    returned with a problem description so it can be flagged.
+    """
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        number = math.nan
+    if not math.isfinite(number):
+        problem = "is missing" if value is None else f"{value!r} is not a number from 1 to 5"
+        return 5, problem
+    level = min(max(math.ceil(number), 1), 5)
+    if level != number:
+        return level, f"{value!r} is not a whole number from 1 to 5, taken as {level}"
+    return level, None
+
+
+def _extra(data, known):
+    """Fields of a dict the data model doesn't know, or None"""
+    extra = {key: value for key, value in data.items() if key not in known}
+    return extra or None
+
+
+def _considerations(value):
+    """Intern special considerations, keeping their dict/list/str shape"""
+    if isinstance(value, dict):
+        return {_text(key): _text(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return _texts(value)
+    return _text(value) if value else {}
+
+
+@dataclass(slots=True)
+class Hazard:
+    potential_hazards: str = ""
+    who_affected: str = ""
+    how_occurs: str = ""
+
+
+@dataclass(slots=True)
+class Step:
+    description: str = ""
+    hazards: Hazard = field(default_factory=Hazard)
+    controls: tuple = ()
+    consequence: int = 1
+    likelihood: int = 1
+    # Descriptions of risk values that could not be used as given, see _level
+    risk_problems: tuple = ()
+    extra: dict = None
+
+    @property
+    def risk(self):
+        return self.consequence * self.likelihood
+
+    @classmethod
+    def from_dict(cls, data):
+        hazards = data.get('hazards', {})
+        if isinstance(hazards, dict):
+            hazard = Hazard(
+                _text(hazards.get('potential_hazards')),
+                _text(hazards.get('who_affected')),
+                _text(hazards.get('how_occurs'))
+            )
+        else:
+            hazard = Hazard(_text(hazards))
+
+        risk = data.get('risk_level', {})
+        if not isinstance(risk, dict):
+            risk = {}
+        consequence, consequence_problem = _level(risk.get('consequence'))
+        likelihood, likelihood_problem = _level(risk.get('likelihood'))
+        problems = tuple(
+            f"{name} {problem}"
+            for name, problem in (("consequence", consequence_problem), ("likelihood", likelihood_problem))
+            if problem
+        )
+
+        return cls(
+            _text(data.get('description')),
+            hazard,
+            _texts(data.get('controls', [])),
+            consequence,
+            likelihood,
+            problems,
+            _extra(data, _STEP_FIELDS)
+        )
+
+    def to_dict(self):
+        data = {
+            "description": self.description,
+            "hazards": {
+                "potential_hazards": self.hazards.potential_hazards,
+                "who_affected": self.hazards.who_affected,
+                "how_occurs": self.hazards.how_occurs
+            },
+            "controls": list(self.controls),
+            "risk_level": {
+                "consequence": self.consequence,
+                "likelihood": self.likelihood
+            }
+        }
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+
+@dataclass(slots=True)
+class JHA:
+    steps: tuple = ()
+    permits_required: tuple = ()
+    special_considerations: object = field(default_factory=dict)
+    location: str = None
+    extra: dict = None
+
+    @classmethod
+    def from_dict(cls, data):
+        steps = data.get('steps', [])
+        return cls(
+            tuple(Step.from_dict(step) for step in steps if isinstance(step, dict)),
+            _texts(data.get('permits_required', [])),
+            _considerations(data.get('special_considerations', {})),
+            _text(data['location']) if data.get('location') else None,
+            _extra(data, _JHA_FIELDS)
+        )
+
+    @classmethod
+    def coerce(cls, value):
+        """Accept either a JHA or the dict format returned by the model"""
+        return value if isinstance(value, cls) else cls.from_dict(value)
+
+    def to_dict(self):
+        data = {
+            "steps": [step.to_dict() for step in self.steps],
+            "permits_required": list(self.permits_required),
+            "special_considerations": (
+                list(self.special_considerations)
+                if isinstance(self.special_considerations, tuple)
+                else self.special_considerations
+            )
+        }
+        if self.location:
+            data['location'] = self.location
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def to_bytes(self):
+        """Serialize to a compact binary form for storage
+
+        marshal writes each interned string once per blob and re-interns it on
+        load. Only load data written by this app, and only with the same Python
+        version.
+        """
+        steps = tuple(
+            (step.description,
+             step.hazards.potential_hazards, step.hazards.who_affected, step.hazards.how_occurs,
+             step.controls, step.consequence, step.likelihood, step.risk_problems, step.extra)
+            for step in self.steps
+        )
+        return marshal.dumps(
+            (FORMAT_VERSION, steps, self.permits_required, self.special_considerations, self.location, self.extra)
+        )
+
+    @staticmethod
+    def risk_levels_from_bytes(data):
+        """Read only the (consequence, likelihood) bytes of a serialized JHA's steps
+
+        Much cheaper than from_bytes when only the risk levels are needed.
+        """
+        version, steps = marshal.loads(data)[:2]
+        if version not in (1, FORMAT_VERSION):
+            raise ValueError(f"Unsupported JHA format version: {version}")
+        return bytes(step[5] for step in steps), bytes(step[6] for step in steps)
+
+    @classmethod
+    def from_bytes(cls, data):
+        version, steps, permits, considerations, location, *rest = marshal.loads(data)
+        if version not in (1, FORMAT_VERSION):
+            raise ValueError(f"Unsupported JHA format version: {version}")
+        return cls(
+            tuple(
+                Step(description, Hazard(potential, who, how), controls, consequence, likelihood, *step_rest)
+                for description, potential, who, how, controls, consequence, likelihood, *step_rest in steps
+            ),
+            permits,
+            considerations,
+            location,
+            *rest
+        )
@@ -0,0 +1,138 @@
+"""Append-only store of every JHA produced
+
+Each record is a length-prefixed marshal blob holding the JHA metadata and the
+JHA's own binary form. Revisions are appended under the same jha_id and
+replace the earlier version when the store is read.
+"""
+import marshal
+import os
+import struct
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+
+from jha_model import JHA
+
+# Default location of the store - JHA_DATA_DIR overrides the data directory next to the app
+DATA_DIR = os.environ.get("JHA_DATA_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+JHA_STORE_PATH = os.path.join(DATA_DIR, "jha_store.bin")
+
+# Version tag at the start of every record
+RECORD_VERSION = 1
+
+_LENGTH = struct.Struct("<I")
+
+
+@dataclass(slots=True)
+class JHARecord:
+    jha_id: str
+    created: float
+    vessel_name: str
+    task_name: str
+    job_description: str
+    location: str
+    work_types: tuple
+    jha: JHA
+
+
+@dataclass(slots=True)
+class RiskEntry:
+    """The parts of a stored JHA the fleet analytics need, read without building the JHA"""
+    jha_id: str
+    created: float
+    vessel_name: str
+    location: str
+    work_types: tuple
+    consequence: bytes
+    likelihood: bytes
+
+
+class JHAStore:
+    """Appends JHA records to a single file and reads back the latest version of each"""
+
+    def __init__(self, path=JHA_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def save(self, jha, jha_id=None, vessel_name="", task_name="", job_description="",
+             location=None, work_types=(), created=None):
+        """Append a JHA (or a revision of one) and return its id"""
+        jha_id = jha_id or uuid.uuid4().hex
+        blob = marshal.dumps((
+            RECORD_VERSION,
+            jha_id,
+            created if created is not None else time.time(),
+            vessel_name or "",
+            task_name or "",
+            job_description or "",
+            location or "",
+            tuple(work_types),
+            JHA.coerce(jha).to_bytes()
+        ))
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._lock, open(self.path, "ab") as f:
+            # One write per record so concurrent appenders don't interleave
+            f.write(_LENGTH.pack(len(blob)) + blob)
+        return jha_id
+
+    def records(self):
+        """Read the latest version of every stored JHA, oldest first"""
+        latest = {}
+        for record in self.read_since(0)[0]:
+            latest.pop(record.jha_id, None)
+            latest[record.jha_id] = record
+        return list(latest.values())
+
+    def get(self, jha_id):
+        """Read the latest version of one stored JHA, or None"""
+        found = None
+        for record in self.read_since(0)[0]:
+            if record.jha_id == jha_id:
+                found = record
+        return found
+
+    def version(self):
+        """A value that changes whenever the store is written, for cache keys"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def read_since(self, offset):
+        """Read the records appended after a byte offset, returning (records, new offset)
+
+        Revisions are returned as separate records, in the order written.
+        """
+        fields, offset = self._read_fields_since(offset)
+        return [JHARecord(*f[1:8], JHA.from_bytes(f[8])) for f in fields], offset
+
+    def read_risks_since(self, offset):
+        """Like read_since, but returning RiskEntry items for the analytics"""
+        fields, offset = self._read_fields_since(offset)
+        return [
+            RiskEntry(f[1], f[2], f[3], f[6], f[7], *JHA.risk_levels_from_bytes(f[8]))
+            for f in fields
+        ], offset
+
+    def _read_fields_since(self, offset):
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return [], offset
+
+        fields = []
+        position = 0
+        while position + _LENGTH.size <= len(data):
+            (length,) = _LENGTH.unpack_from(data, position)
+            if position + _LENGTH.size + length > len(data):
+                break  # Partially written last record
+            record = marshal.loads(data[position + _LENGTH.size:position + _LENGTH.size + length])
+            position += _LENGTH.size + length
+            if record[0] == RECORD_VERSION:
+                fields.append(record)
+        return fields, offset + position
@@ -0,0 +1,176 @@
+"""Load test for the HTTP API against the local stub model
+
+Starts the API server in-process with the stub model, then runs concurrent
+clients through create -> revise -> export and reports latency and throughput.
+Stored JHAs and other data go to a temporary directory.
+
+Run with:
+    python load_test_api.py --clients 20 --jobs 5 --stub-latency 0.5 --workers 4 --queue-size 16
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+
+def request(base_url, method, path, payload=None):
+    """Send a request and return (status, headers, body)"""
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    req = urllib.request.Request(base_url + path, data=data, method=method,
+                                 headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+
+class Stats:
+    """Thread-safe latency and rejection counters"""
+
+    def __init__(self):
+        self.latencies = {"create": [], "revise": [], "export": []}
+        self.rejected = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+
+    def record(self, kind, seconds):
+        with self._lock:
+            self.latencies[kind].append(seconds)
+
+    def reject(self):
+        with self._lock:
+            self.rejected += 1
+
+    def fail(self):
+        with self._lock:
+            self.failed += 1
+
+
+def run_job(base_url, path, payload, stats, poll_interval):
+    """Submit a job, retrying on 503, and poll it until it finishes"""
+    while True:
+        status, headers, body = request(base_url, "POST", path, payload)
+        if status != 503:
+            break
+        stats.reject()
+        time.sleep(float(headers.get("Retry-After", 1)))
+
+    if status != 202:
+        stats.fail()
+        return None
+
+    job_id = json.loads(body)["job_id"]
+    while True:
+        status, _, body = request(base_url, "GET", f"/jobs/{job_id}")
+        job = json.loads(body)
+        if job.get("status") in ("done", "failed"):
+            break
+        time.sleep(poll_interval)
+
+    if job["status"] != "done":
+        stats.fail()
+        return None
+    return job["result"]
+
+
+def run_client(base_url, jobs, stats, poll_interval):
+    """Run one client through create -> revise -> export a number of times"""
+    for i in range(jobs):
+        start = time.perf_counter()
+        jha = run_job(base_url, "/jha", {
+            "job_description": f"Replace impeller on FW pump {i}",
+            "work_types": ["LOTO", "Critical Equipment"],
+            "location": "Engine Room"
+        }, stats, poll_interval)
+        if jha is None:
+            continue
+        stats.record("create", time.perf_counter() - start)
+
+        start = time.perf_counter()
+        jha = run_job(base_url, "/jha/revise", {
+            "jha": jha,
+            "message": "Add a step for testing the pump after reassembly",
+            "work_types": ["LOTO", "Critical Equipment"],
+            "location": "Engine Room"
+        }, stats, poll_interval)
+        if jha is None:
+            continue
+        stats.record("revise", time.perf_counter() - start)
+
+        start = time.perf_counter()
+        status, _, _ = request(base_url, "POST", "/jha/export", {
+            "jha": jha, "vessel_name": "Load Test", "task_name": f"Pump {i}"
+        })
+        if status != 200:
+            stats.fail()
+            continue
+        stats.record("export", time.perf_counter() - start)
+
+
+def percentile(values, pct):
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the JHA HTTP API")
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--jobs", type=int, default=5, help="Create/revise/export rounds per client")
+    parser.add_argument("--stub-latency", type=float, default=0.5)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--queue-size", type=int, default=16)
+    parser.add_argument("--poll-interval", type=float, default=0.05)
+    args = parser.parse_args()
+
+    # Keep load-test JHAs out of the real store; must be set before the service modules are imported
+    data_dir = tempfile.TemporaryDirectory()
+    os.environ["JHA_DATA_DIR"] = data_dir.name
+
+    import google.generativeai as genai
+    from stub_model import StubModel
+
+    # The service's model and the instruction-bound model it creates are both the stub
+    stub = StubModel(latency=args.stub_latency)
+    mock.patch.object(genai, "GenerativeModel", stub.as_constructor()).start()
+
+    import api_server
+
+    server = api_server.create_server(port=0, workers=args.workers, queue_size=args.queue_size, quiet=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    stats = Stats()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clients) as pool:
+        clients = [pool.submit(run_client, base_url, args.jobs, stats, args.poll_interval)
+                   for _ in range(args.clients)]
+        # Re-raise anything a client raised instead of losing it with the future
+        for client in clients:
+            client.result()
+    elapsed = time.perf_counter() - start
+
+    server.shutdown()
+    server.server_close()
+    server.jobs.shutdown()
+
+    completed = len(stats.latencies["export"])
+    print(f"Clients: {args.clients}  Workers: {args.workers}  Queue size: {args.queue_size}  "
+          f"Stub latency: {args.stub_latency}s")
+    print(f"Completed rounds: {completed}  Failed: {stats.failed}  Rejected (503): {stats.rejected}")
+    print(f"Elapsed: {elapsed:.2f}s  Throughput: {completed / elapsed:.2f} rounds/s  "
+          f"Model calls: {stub.calls}")
+    for kind, values in stats.latencies.items():
+        if values:
+            print(f"{kind:>7}: p50={percentile(values, 50) * 1000:.0f}ms  "
+                  f"p95={percentile(values, 95) * 1000:.0f}ms  max={max(values) * 1000:.0f}ms")
+
+    data_dir.cleanup()
@@ -0,0 +1,193 @@
+"""Concurrent-session load test for the Streamlit app
+
+Drives simulated sessions through generate -> revise -> download with
+Streamlit's AppTest, all on threads in one process sharing one stub model in
+place of Gemini, and reports per-step latency percentiles, throughput and
+memory per session. Sessions share the app's model, BackgroundRunner, prefix
+cache and stores, and their model calls overlap; a session that raises is
+counted as an error and the run carries on. Stored JHAs and other data go to
+a temporary directory.
+
+Run with:
+    python load_test_app.py --sessions 20 --concurrency 5 --stub-latency 0.5
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+# "generate_new" is the click on Generate New JHA when a session is offered past JHAs first
+STEPS = ("load", "generate", "generate_new", "revise", "download")
+
+# AppTest swaps process-wide singletons (the Streamlit runtime, config options)
+# for each script run, so overlapping runs break each other. Script runs are
+# serialized; the model calls they start still overlap in the shared
+# BackgroundRunner, which is where sessions contend.
+_script_run_lock = threading.Lock()
+
+
+def rss_bytes():
+    """Current resident set size on Linux, or None elsewhere"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+class Results:
+    """Thread-safe per-step latencies and error counts"""
+
+    def __init__(self):
+        self.latencies = {step: [] for step in STEPS}
+        self.errors = []
+        self._lock = threading.Lock()
+
+    def record(self, step, seconds):
+        with self._lock:
+            self.latencies[step].append(seconds)
+
+    def error(self, session, step, message):
+        with self._lock:
+            self.errors.append(f"session {session} {step}: {message}")
+
+
+def check(at, results, session, step):
+    """Record script exceptions and st.error messages from the last run"""
+    for exception in at.exception:
+        results.error(session, step, exception.message)
+    for error in at.error:
+        results.error(session, step, error.value)
+    return not at.exception and not at.error
+
+
+def timed_run(at, results, session, step, action=None, poll=0.05):
+    """Run the script, then rerun until any background model call has finished"""
+    start = time.perf_counter()
+    if action:
+        action()
+    with _script_run_lock:
+        at.run()
+    # The page polls running calls once a second; poll faster for precise timings
+    while at.session_state.model_call is not None and not at.exception:
+        time.sleep(poll)
+        with _script_run_lock:
+            at.run()
+    results.record(step, time.perf_counter() - start)
+    return check(at, results, session, step)
+
+
+def run_session(session, results, timeout):
+    """Drive one session through generate -> revise -> download; returns the AppTest"""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    if not timed_run(at, results, session, "load"):
+        return at
+
+    # Generate
+    at.text_input[0].input(f"Load Test Vessel {session}")
+    at.text_input[1].input(f"Pump overhaul {session}")
+    at.text_area[0].input(f"Replace impeller on FW pump {session}")
+    next(cb for cb in at.checkbox if cb.label == "LOTO").check()
+    generate = next(b for b in at.button if b.label == "Generate JHA")
+    if not timed_run(at, results, session, "generate", generate.click):
+        return at
+    # Sessions share similar descriptions, so later ones are offered past JHAs first
+    generate_new = next((b for b in at.button if b.label == "Generate New JHA"), None)
+    if generate_new and not timed_run(at, results, session, "generate_new", generate_new.click):
+        return at
+
+    # Revise through the chat
+    next(t for t in at.text_input if t.label == "Type your message...").input(
+        "Add a step for testing the pump after reassembly"
+    )
+    send = next(b for b in at.button if b.label == "Send")
+    if not timed_run(at, results, session, "revise", send.click):
+        return at
+
+    # Download - a rerun renders the JHA and builds the .docx for the download button
+    if timed_run(at, results, session, "download") and not at.get("download_button"):
+        results.error(session, "download", "No download button rendered")
+    return at
+
+
+def run_session_safely(session, results, timeout):
+    """Run one session, counting an exception as an error instead of ending the run"""
+    try:
+        return run_session(session, results, timeout)
+    except Exception as e:
+        results.error(session, "session", f"{type(e).__name__}: {e}")
+        return None
+
+
+def percentile(values, pct):
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the Streamlit app with concurrent sessions")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=5, help="Sessions running at the same time")
+    parser.add_argument("--stub-latency", type=float, default=0.5, help="Stub model delay per call in seconds")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Stub model delay per input token")
+    parser.add_argument("--timeout", type=float, default=120, help="Seconds allowed per script run")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Measure Python allocations with tracemalloc (slower) instead of RSS")
+    args = parser.parse_args()
+
+    # Keep load-test JHAs out of the real store; must be set before the app modules are imported
+    data_dir = tempfile.TemporaryDirectory()
+    os.environ["JHA_DATA_DIR"] = data_dir.name
+
+    import google.generativeai as genai
+    from stub_model import StubModel
+
+    stub = StubModel(args.stub_latency, args.token_latency)
+    results = Results()
+
+    with mock.patch.object(genai, "GenerativeModel", stub.as_constructor()):
+        # Warm up imports and caches so they don't count towards the first sessions
+        from streamlit.testing.v1 import AppTest
+        AppTest.from_file(APP_PATH, default_timeout=args.timeout).run()
+        stub.calls = stub.input_tokens = 0
+
+        if args.trace_memory:
+            tracemalloc.start()
+        memory_before = tracemalloc.get_traced_memory()[0] if args.trace_memory else rss_bytes()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            sessions = list(pool.map(lambda i: run_session_safely(i, results, args.timeout), range(args.sessions)))
+        elapsed = time.perf_counter() - start
+
+        # Sessions are still referenced, so their state is included
+        memory_after = tracemalloc.get_traced_memory()[0] if args.trace_memory else rss_bytes()
+
+    completed = len(results.latencies["download"])
+    print(f"Sessions: {args.sessions}  Concurrency: {args.concurrency}  Stub latency: {args.stub_latency}s")
+    print(f"Completed: {completed}  Errors: {len(results.errors)}  Model calls: {stub.calls}")
+    print(f"Elapsed: {elapsed:.2f}s  Throughput: {completed / elapsed:.2f} sessions/s")
+    for step in STEPS:
+        values = results.latencies[step]
+        if values:
+            print(f"{step:>12}: p50={percentile(values, 50) * 1000:7.0f}ms  "
+                  f"p95={percentile(values, 95) * 1000:7.0f}ms  "
+                  f"p99={percentile(values, 99) * 1000:7.0f}ms")
+    if memory_before is not None and memory_after is not None:
+        source = "tracemalloc" if args.trace_memory else "RSS"
+        print(f"Memory per session ({source}): {(memory_after - memory_before) / args.sessions / 1024:.0f} KB")
+    for error in results.errors[:10]:
+        print(f"  {error}")
+
+    del sessions
+    data_dir.cleanup()
@@ -0,0 +1,162 @@
+"""Content-addressed storage for uploaded equipment manuals
+
+Uploads are streamed in chunks into a temporary file while being hashed, then
+moved to <sha256>.pdf, so identical manuals uploaded under different names are
+stored once. Text extraction runs on a background worker and writes
+<sha256>.txt next to the PDF. Sessions touch the manuals they hold; files not
+touched within ORPHAN_MAX_AGE are garbage-collected.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from jha_store import DATA_DIR
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+MANUAL_STORE_PATH = os.path.join(DATA_DIR, "manuals")
+
+# Bytes read from an upload at a time
+CHUNK_SIZE = 1024 * 1024
+
+# Seconds a manual may go untouched before it is removed
+ORPHAN_MAX_AGE = 7 * 24 * 3600
+
+# Seconds before an unfinished upload or extraction is treated as abandoned
+PARTIAL_MAX_AGE = 3600
+
+# Seconds between garbage collections triggered by uploads
+GC_INTERVAL = 3600
+
+
+class ManualStore:
+    """Stores manuals by SHA-256 and extracts their text in the background"""
+
+    def __init__(self, root=MANUAL_STORE_PATH, chunk_size=CHUNK_SIZE, max_age=ORPHAN_MAX_AGE):
+        self.root = root
+        self.chunk_size = chunk_size
+        self.max_age = max_age
+        os.makedirs(root, exist_ok=True)
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="manual-worker")
+        self._extractions = {}
+        self._lock = threading.Lock()
+        self._last_gc = 0.0
+
+    def pdf_path(self, digest):
+        return os.path.join(self.root, f"{digest}.pdf")
+
+    def text_path(self, digest):
+        return os.path.join(self.root, f"{digest}.txt")
+
+    def store(self, fileobj):
+        """Stream a file into the store, returning (sha256, size)"""
+        hasher = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while True:
+                    chunk = fileobj.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    hasher.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+
+            digest = hasher.hexdigest()
+            if os.path.exists(self.pdf_path(digest)):
+                # Already stored under another name
+                os.remove(tmp_path)
+                self.touch(digest)
+            else:
+                os.replace(tmp_path, self.pdf_path(digest))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self._schedule_gc()
+        return digest, size
+
+    def touch(self, digest):
+        """Mark a manual as still in use so it is not garbage-collected"""
+        for path in (self.pdf_path(digest), self.text_path(digest)):
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                pass
+
+    def queue_extraction(self, digest):
+        """Queue text extraction for a stored manual, unless it is done or already queued"""
+        with self._lock:
+            future = self._extractions.get(digest)
+            if os.path.exists(self.text_path(digest)) or (future and not future.done()):
+                return
+            self._extractions[digest] = self._executor.submit(self._extract, digest)
+
+    def extraction_status(self, digest):
+        """One of "done", "pending", "failed" or "unavailable" (pypdf not installed)"""
+        if os.path.exists(self.text_path(digest)):
+            return "done"
+        if PdfReader is None:
+            return "unavailable"
+        with self._lock:
+            future = self._extractions.get(digest)
+        if future is None or not future.done():
+            return "pending"
+        return "failed" if future.exception() else "done"
+
+    def read_text(self, digest):
+        """Get the extracted text of a manual, or None if it isn't ready"""
+        try:
+            with open(self.text_path(digest), encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def collect_garbage(self, max_age=None):
+        """Remove manuals not touched within max_age and abandoned partial files"""
+        now = time.time()
+        max_age = self.max_age if max_age is None else max_age
+        removed = 0
+        for entry in os.scandir(self.root):
+            limit = PARTIAL_MAX_AGE if entry.name.endswith(".part") else max_age
+            try:
+                if now - entry.stat().st_mtime > limit:
+                    os.remove(entry.path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def _schedule_gc(self):
+        now = time.time()
+        with self._lock:
+            if now - self._last_gc < GC_INTERVAL:
+                return
+            self._last_gc = now
+        self._executor.submit(self.collect_garbage)
+
+    def _extract(self, digest):
+        if PdfReader is None:
+            return
+
+        reader = PdfReader(self.pdf_path(digest))
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".part")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as out:
+                for page in reader.pages:
+                    out.write(page.extract_text() or "")
+                    out.write("\n")
+            os.replace(tmp_path, self.text_path(digest))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
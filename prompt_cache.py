@@ -0,0 +1,53 @@
+"""Reuse of a static prompt prefix across model calls
+
+The static instructions are attached to a model once, as server-side cached
+content or a system instruction, and the model is reused for every request so
+each prompt holds only the variable part. Only cached content saves input
+tokens; a system instruction is still counted with every request. Cached
+content expires, so the model is recreated shortly before its expiry time.
+"""
+import threading
+from datetime import datetime, timedelta, timezone
+
+# Recreate cached content this long before it expires
+REFRESH_MARGIN = timedelta(minutes=5)
+
+
+class PrefixModelCache:
+    """Holds a model bound to static instructions and refreshes it when it expires
+
+    factory(base_model, instructions) returns (model, expire_time), where
+    expire_time is an aware datetime or None if the binding never expires.
+    """
+
+    def __init__(self, instructions, factory, refresh_margin=REFRESH_MARGIN):
+        self.instructions = instructions
+        self.refresh_margin = refresh_margin
+        self.refreshes = 0
+        self._factory = factory
+        self._model = None
+        self._key = None
+        self._expires = None
+        self._lock = threading.Lock()
+
+    def get(self, base_model):
+        """Get the instruction-bound model for base_model, creating or refreshing it as needed"""
+        # Gemini models are recreated on every Streamlit rerun, so key them by name
+        key = getattr(base_model, "model_name", None) or id(base_model)
+        with self._lock:
+            if self._model is None or key != self._key or self._expired():
+                self._model, self._expires = self._factory(base_model, self.instructions)
+                self._key = key
+                self.refreshes += 1
+            return self._model
+
+    def invalidate(self):
+        """Drop the current model, e.g. after the server reports the cache is gone"""
+        with self._lock:
+            self._model = None
+
+    def _expired(self):
+        if self._expires is None:
+            return False
+        expires = self._expires if self._expires.tzinfo else self._expires.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc) >= expires - self.refresh_margin
@@ -0,0 +1,282 @@
+"""Maintenance-calendar scheduler that pre-generates JHAs ahead of due dates
+
+Imports a planned maintenance plan (CSV or JSON) with tasks, intervals,
+locations and work types, works out upcoming due dates and, during quiet
+hours, generates the JHAs for tasks due within the look-ahead window. They are
+kept in a separate JHA store under the id "<task_id>:<content digest>", so a
+task gets one JHA that every due date uses until its description, work types
+or location change, and the app can offer it when the work comes up.
+
+Run with:
+    python scheduler.py plan.csv --days 14
+    python scheduler.py plan.csv --days 14 --watch --quiet-hours 22-06
+
+CSV columns: task_id, task, description, interval, location, work_types
+(separated by ";"), last_done (YYYY-MM-DD) and optionally vessel.
+"""
+import argparse
+import calendar
+import csv
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+from jha_store import DATA_DIR, JHAStore
+
+# Store for pre-generated JHAs, separate from the JHAs crews have worked with
+PREGENERATED_STORE_PATH = os.path.join(DATA_DIR, "pregenerated_jhas.bin")
+
+# Define maintenance interval patterns
+maintenance_patterns = {
+    "daily": r"(?:daily|each day|24\s*hour|every\s*day)",
+    "weekly": r"(?:weekly|each week|7\s*day|every\s*week)",
+    "monthly": r"(?:monthly|each month|30\s*day|every\s*month)",
+    "quarterly": r"(?:quarterly|every\s*3\s*months?|(?:three|3)[\s-]*monthly)",
+    "semi_annual": r"(?:semi[- ]annual|every\s*6\s*months?|(?:six|6)[\s-]*monthly)",
+    "annual": r"(?:annual|yearly|each year|every\s*year|12\s*month)",
+    "two_yearly": r"(?:(?:two|2)[\s-]*yearly|every\s*2\s*years?|24\s*month)",
+    "five_yearly": r"(?:(?:five|5)[\s-]*yearly|every\s*5\s*years?|60\s*month)"
+}
+
+# Length of each interval as (months, days)
+interval_lengths = {
+    "daily": (0, 1),
+    "weekly": (0, 7),
+    "monthly": (1, 0),
+    "quarterly": (3, 0),
+    "semi_annual": (6, 0),
+    "annual": (12, 0),
+    "two_yearly": (24, 0),
+    "five_yearly": (60, 0)
+}
+
+# Longer and more specific patterns first, so "semi-annual" is not read as "annual"
+_INTERVAL_ORDER = ["semi_annual", "two_yearly", "five_yearly", "quarterly", "annual", "monthly", "weekly", "daily"]
+
+_DIGIT = re.compile(r"\d")
+
+
+@dataclass(slots=True)
+class MaintenanceTask:
+    task_id: str
+    task: str
+    description: str
+    interval: str
+    location: str
+    work_types: tuple
+    last_done: date = None
+    vessel: str = ""
+
+
+def parse_interval(text):
+    """Map an interval description to a maintenance_patterns category"""
+    value = text.strip().lower().replace(" ", "_")
+    if value in maintenance_patterns:
+        return value
+    for category in _INTERVAL_ORDER:
+        match = re.search(maintenance_patterns[category], text, re.IGNORECASE)
+        if match:
+            # A number outside the match, as in "2 weekly", means a different interval
+            if _DIGIT.search(text[:match.start()] + " " + text[match.end():]):
+                break
+            return category
+    raise ValueError(f"Unknown maintenance interval: {text}")
+
+
+def add_interval(start, category, count=1):
+    """Add count intervals to a date, clamping to the end of shorter months"""
+    months, days = interval_lengths[category]
+    months, days = months * count, days * count
+    if months:
+        month_index = start.month - 1 + months
+        year = start.year + month_index // 12
+        month = month_index % 12 + 1
+        start = start.replace(year=year, month=month, day=min(start.day, calendar.monthrange(year, month)[1]))
+    return start + timedelta(days=days)
+
+
+def due_dates(task, start, end):
+    """Due dates of a task between start and end, inclusive"""
+    # Dates are counted from one anchor, so a month-end date clamped to the
+    # 28th in February is back on the 31st in March
+    if task.last_done and add_interval(task.last_done, task.interval) >= start:
+        anchor, count = task.last_done, 1
+    else:
+        # Tasks never done, or overdue, are due now
+        anchor, count = start, 0
+    dates = []
+    due = add_interval(anchor, task.interval, count)
+    while due <= end:
+        dates.append(due)
+        count += 1
+        due = add_interval(anchor, task.interval, count)
+    return dates
+
+
+def _task_from_row(row):
+    last_done = (row.get("last_done") or "").strip()
+    work_types = row.get("work_types") or []
+    if isinstance(work_types, str):
+        work_types = [w.strip() for w in work_types.split(";") if w.strip()]
+    return MaintenanceTask(
+        task_id=str(row["task_id"]).strip(),
+        task=row["task"].strip(),
+        description=(row.get("description") or row["task"]).strip(),
+        interval=parse_interval(row["interval"]),
+        location=(row.get("location") or "").strip(),
+        work_types=tuple(work_types),
+        last_done=date.fromisoformat(last_done) if last_done else None,
+        vessel=(row.get("vessel") or "").strip()
+    )
+
+
+def load_plan(path):
+    """Load maintenance tasks from a CSV or JSON plan"""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".json"):
+            rows = json.load(f)
+        else:
+            rows = list(csv.DictReader(f))
+    return [_task_from_row(row) for row in rows]
+
+
+def upcoming(tasks, days, today=None):
+    """(due date, task) pairs for everything due in the next days, soonest first"""
+    today = today or date.today()
+    end = today + timedelta(days=days)
+    return sorted(
+        ((due, task) for task in tasks for due in due_dates(task, today, end)),
+        key=lambda item: (item[0], item[1].task_id)
+    )
+
+
+def pregenerated_id(task):
+    """Store id shared by every due date of a task while its content is unchanged"""
+    content = "\0".join((task.description, ";".join(sorted(task.work_types)), task.location))
+    return f"{task.task_id}:{hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]}"
+
+
+def pregenerate(tasks, days, generate, store, today=None, limit=None, should_continue=None):
+    """Generate and store JHAs for tasks due in the next days that don't have one yet
+
+    generate(job_description, work_types, location) returns a JHA dict and
+    raises on failure. Returns (generated count, [(task, due, error)] failures).
+    """
+    existing = {record.jha_id for record in store.records()}
+
+    generated = 0
+    failures = []
+    for due, task in upcoming(tasks, days, today):
+        if limit is not None and generated >= limit:
+            break
+        if should_continue and not should_continue():
+            break
+        jha_id = pregenerated_id(task)
+        if jha_id in existing:
+            continue
+        # Tried once per run, even when the task falls due several times in the window
+        existing.add(jha_id)
+        try:
+            jha = generate(task.description, list(task.work_types), task.location or None)
+        except Exception as e:
+            failures.append((task, due, e))
+            continue
+        store.save(
+            jha,
+            jha_id=jha_id,
+            vessel_name=task.vessel,
+            task_name=task.task,
+            job_description=task.description,
+            location=task.location,
+            work_types=task.work_types
+        )
+        generated += 1
+    return generated, failures
+
+
+class PregeneratedIndex:
+    """Pre-generated JHAs by vessel and task name, kept up to date from the store incrementally"""
+
+    def __init__(self, store):
+        self.store = store
+        self._by_task = {}
+        self._lock = threading.Lock()
+        # Byte offset of the store already indexed
+        self.store_offset = 0
+
+    @staticmethod
+    def _key(vessel_name, task_name):
+        return ((vessel_name or "").strip().lower(), task_name.strip().lower())
+
+    def refresh(self):
+        """Index the records appended since the last refresh"""
+        with self._lock:
+            records, self.store_offset = self.store.read_since(self.store_offset)
+            for record in records:
+                task_id = record.jha_id.rsplit(":", 1)[0]
+                # A newer JHA for the task, after a plan change, replaces the older one
+                self._by_task.setdefault(self._key(record.vessel_name, record.task_name), {})[task_id] = record
+        return len(records)
+
+    def find(self, vessel_name, task_name):
+        """Pre-generated JHAs for a vessel's task, newest first
+
+        JHAs from plans without a vessel column are offered on every vessel.
+        """
+        self.refresh()
+        with self._lock:
+            matches = list(self._by_task.get(self._key(vessel_name, task_name), {}).values())
+            if (vessel_name or "").strip():
+                matches += self._by_task.get(self._key("", task_name), {}).values()
+        return sorted(matches, key=lambda record: record.created, reverse=True)
+
+
+def in_quiet_hours(quiet_hours, now=None):
+    """Check a "start-end" hour range such as "22-06", which may wrap past midnight"""
+    if not quiet_hours:
+        return True
+    start, end = (int(hour) for hour in quiet_hours.split("-"))
+    hour = (now or datetime.now()).hour
+    return start <= hour < end if start < end else hour >= start or hour < end
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-generate JHAs for upcoming planned maintenance")
+    parser.add_argument("plan", help="Maintenance plan as CSV or JSON")
+    parser.add_argument("--days", type=int, default=14, help="Look-ahead window in days")
+    parser.add_argument("--quiet-hours", default=None, help='Only generate between these hours, e.g. "22-06"')
+    parser.add_argument("--watch", action="store_true", help="Keep running and check the plan periodically")
+    parser.add_argument("--check-every", type=float, default=15, help="Minutes between checks with --watch")
+    parser.add_argument("--batch", type=int, default=None, help="Most JHAs to generate per check")
+    parser.add_argument("--list", action="store_true", help="Only list upcoming due dates")
+    args = parser.parse_args()
+
+    tasks = load_plan(args.plan)
+    if args.list:
+        for due, task in upcoming(tasks, args.days):
+            print(f"{due.isoformat()}  {task.task_id:<10} {task.task} ({task.interval}, {task.location})")
+        raise SystemExit(0)
+
+    import jha_service
+
+    store = JHAStore(PREGENERATED_STORE_PATH)
+    while True:
+        if in_quiet_hours(args.quiet_hours):
+            generated, failures = pregenerate(
+                tasks, args.days, jha_service.generate_checked_jha, store,
+                limit=args.batch,
+                should_continue=lambda: in_quiet_hours(args.quiet_hours)
+            )
+            for task, due, error in failures:
+                print(f"Failed to generate JHA for {task.task} due {due}: {error}")
+            print(f"{datetime.now():%Y-%m-%d %H:%M} generated {generated} JHAs, {len(failures)} failed")
+        if not args.watch:
+            break
+        time.sleep(args.check_every * 60)
+        # Pick up plan changes between checks
+        tasks = load_plan(args.plan)
@@ -0,0 +1,131 @@
+"""Near-duplicate detection of past JHAs with MinHash and LSH
+
+Job descriptions are normalized (case, punctuation, unit numbers such as
+"no. 1" or "2") and split into word shingles. A MinHash signature of each
+shingle set is banded into an LSH index partitioned by location and work type
+set, so a query only compares against past JHAs for the same kind of work that
+share a band. Candidates are ranked by the exact Jaccard similarity of their
+shingle sets.
+"""
+import re
+import threading
+import zlib
+
+import numpy as np
+
+# Default lowest similarity offered for reuse
+SIMILARITY_THRESHOLD = 0.6
+
+# Signature length and banding; 32 bands of 4 rows catch pairs from about 0.4 similarity
+NUM_PERM = 128
+BANDS = 32
+
+_PRIME = (1 << 31) - 1
+
+_STOPWORDS = {"a", "an", "and", "at", "for", "in", "of", "on", "the", "to", "with"}
+
+# "no. 1", "nr 2", "number 3", "#4" and bare numbers are unit designations
+_NUMBERING = re.compile(r"\b(?:no|nr|number)\b\.?\s*(?=\d)|#(?=\d)")
+_NUMBER = re.compile(r"\d+")
+_WORD = re.compile(r"[a-z#]+")
+
+
+def normalize(text):
+    """Lowercase text and collapse unit numbering, returning its words"""
+    text = _NUMBERING.sub("", text.lower())
+    text = _NUMBER.sub("#", text)
+    return [word for word in _WORD.findall(text) if word not in _STOPWORDS]
+
+
+def shingles(job_description):
+    """Word unigrams and bigrams of a normalized job description"""
+    words = normalize(job_description)
+    result = set(words)
+    result.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    return frozenset(result)
+
+
+def context_key(work_types=(), location=None):
+    """Partition key - only JHAs for the same location and work type set are compared"""
+    return ((location or "").lower(), frozenset(w.lower() for w in work_types))
+
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class SimilarityIndex:
+    """MinHash LSH index of past JHAs keyed by jha_id"""
+
+    def __init__(self, num_perm=NUM_PERM, bands=BANDS, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, num_perm, dtype=np.int64)[:, None]
+        self._b = rng.integers(0, _PRIME, num_perm, dtype=np.int64)[:, None]
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._buckets = {}
+        self._shingles = {}
+        # Band keys of each indexed JHA, so a re-added JHA leaves its old buckets
+        self._keys_bands = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        # Job description of each indexed JHA, for display
+        self.descriptions = {}
+        # Byte offset of the JHA store already indexed, see refresh()
+        self.store_offset = 0
+
+    def __len__(self):
+        return len(self._shingles)
+
+    def signature(self, shingle_set):
+        """MinHash signature of a shingle set"""
+        if not shingle_set:
+            return np.full(self._a.shape[0], _PRIME, dtype=np.int64)
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) % _PRIME for s in shingle_set),
+            dtype=np.int64, count=len(shingle_set)
+        )
+        return ((self._a * hashes + self._b) % _PRIME).min(axis=1)
+
+    def _band_keys(self, context, signature):
+        return [(context, i, signature[i * self.rows:(i + 1) * self.rows].tobytes()) for i in range(self.bands)]
+
+    def add(self, key, job_description, work_types=(), location=None):
+        """Index a JHA; adding the same key again replaces its entry"""
+        shingle_set = shingles(job_description)
+        band_keys = self._band_keys(context_key(work_types, location), self.signature(shingle_set))
+        with self._lock:
+            for band_key in self._keys_bands.get(key, ()):
+                bucket = self._buckets[band_key]
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
+            self._shingles[key] = shingle_set
+            self._keys_bands[key] = band_keys
+            self.descriptions[key] = job_description
+            for band_key in band_keys:
+                self._buckets.setdefault(band_key, set()).add(key)
+
+    def query(self, job_description, work_types=(), location=None, threshold=SIMILARITY_THRESHOLD, limit=5):
+        """Most similar indexed JHAs as [(key, similarity)], best first"""
+        shingle_set = shingles(job_description)
+        band_keys = self._band_keys(context_key(work_types, location), self.signature(shingle_set))
+        with self._lock:
+            candidates = set()
+            for band_key in band_keys:
+                candidates.update(self._buckets.get(band_key, ()))
+            scored = [(key, jaccard(shingle_set, self._shingles[key])) for key in candidates]
+        matches = [(key, score) for key, score in scored if score >= threshold]
+        return sorted(matches, key=lambda item: item[1], reverse=True)[:limit]
+
+    def refresh(self, store):
+        """Index the records appended to a JHAStore since the last refresh"""
+        with self._refresh_lock:
+            records, self.store_offset = store.read_since(self.store_offset)
+            for record in records:
+                self.add(record.jha_id, record.job_description, record.work_types, record.location)
+        return len(records)
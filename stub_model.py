@@ -0,0 +1,160 @@
+"""Local stand-in for the Gemini model, used by the load-test and benchmark scripts"""
+import asyncio
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+# Canned JHA returned for every generation request
+STUB_JHA = {
+    "steps": [
+        {
+            "description": "Job Planning - Daily Work Planning Meeting (RTHB Page 13)",
+            "hazards": {
+                "potential_hazards": "Inadequate planning",
+                "who_affected": "All personnel involved",
+                "how_occurs": "Hazards not identified before work starts"
+            },
+            "controls": ["Daily Work Planning Meeting held (RTHB Page 13)"],
+            "risk_level": {"consequence": 2, "likelihood": 2}
+        },
+        {
+            "description": "Take-5 Assessment (RTHB Page 16)",
+            "hazards": {
+                "potential_hazards": "Changed conditions at the worksite",
+                "who_affected": "Work team",
+                "how_occurs": "Conditions differ from the plan"
+            },
+            "controls": ["Take-5 completed by each team member (RTHB Page 16)"],
+            "risk_level": {"consequence": 2, "likelihood": 1}
+        },
+        {
+            "description": "Toolbox Talk (RTHB Page 16)",
+            "hazards": {
+                "potential_hazards": "Miscommunication",
+                "who_affected": "Work team",
+                "how_occurs": "Roles and hazards not understood"
+            },
+            "controls": ["Toolbox Talk held at the worksite (RTHB Page 16)"],
+            "risk_level": {"consequence": 2, "likelihood": 1}
+        },
+        {
+            "description": "Carry out the task",
+            "hazards": {
+                "potential_hazards": "Moving machinery, hot surfaces",
+                "who_affected": "Technicians",
+                "how_occurs": "Contact with moving or hot parts"
+            },
+            "controls": [
+                "Verify zero energy state before work",
+                "Hearing protection",
+                "Required PPE as per PPE Matrix REF-1412"
+            ],
+            "risk_level": {"consequence": 3, "likelihood": 2}
+        }
+    ],
+    "permits_required": ["Work Permit"],
+    "special_considerations": {
+        "location_specific": "None",
+        "work_type_specific": "None"
+    }
+}
+
+
+class StubResponse:
+    """Mimics the parts of a Gemini response the app reads"""
+
+    def __init__(self, text):
+        self.text = text
+
+
+def count_tokens(text):
+    """Rough token estimate - about four characters per token"""
+    return (len(text) + 3) // 4
+
+
+class StubModel:
+    """Answers generate_content calls with canned JHAs after a delay
+
+    The delay is latency plus token_latency for every input token, so prompts
+    that send less text finish sooner, as they would with a real model.
+    """
+
+    model_name = "models/stub"
+
+    def __init__(self, latency=0.0, token_latency=0.0):
+        self.latency = latency
+        self.token_latency = token_latency
+        self.calls = 0
+        self.input_tokens = 0
+        self.instruction_tokens = 0
+        self._lock = threading.Lock()
+
+    def count_tokens(self, contents):
+        return SimpleNamespace(total_tokens=count_tokens(contents))
+
+    def with_system_instruction(self, instructions, cached=False):
+        """Attach static instructions
+
+        As with the real API, a system instruction is sent and counted with
+        every call, while cached content is counted once here.
+        """
+        if cached:
+            with self._lock:
+                self.instruction_tokens += count_tokens(instructions)
+        return BoundStubModel(self, instructions, 0 if cached else count_tokens(instructions))
+
+    def as_constructor(self):
+        """Stand-in for genai.GenerativeModel that returns this stub, for patching"""
+        def constructor(model_name=None, system_instruction=None, **kwargs):
+            return self.with_system_instruction(system_instruction) if system_instruction else self
+        return constructor
+
+    def _count(self, prompt, extra_tokens=0):
+        """Record a call and return its delay in seconds"""
+        tokens = count_tokens(prompt) + extra_tokens
+        with self._lock:
+            self.calls += 1
+            self.input_tokens += tokens
+        return self.latency + self.token_latency * tokens
+
+    def generate_content(self, prompt, extra_tokens=0):
+        time.sleep(self._count(prompt, extra_tokens))
+        return self._respond(prompt)
+
+    async def generate_content_async(self, prompt, extra_tokens=0):
+        # Cancelling the awaiting task aborts the call, as with the real async client
+        await asyncio.sleep(self._count(prompt, extra_tokens))
+        return self._respond(prompt)
+
+    def _respond(self, prompt):
+        # Translation prompts list the segments; prefix each with the language
+        if "JSON array of translated segments" in prompt:
+            language = prompt.split(" to ", 1)[1].split(".", 1)[0]
+            segments = json.loads(prompt.split("Segments:", 1)[1])
+            return StubResponse(json.dumps([f"[{language}] {segment}" for segment in segments]))
+
+        # Revision prompts embed the current JHA; echo it back with a marker control
+        if "Current JHA data:" in prompt:
+            body = prompt.split("Current JHA data:", 1)[1]
+            jha = json.loads(body[body.find('{'):body.rfind('}') + 1])
+            if jha.get('steps'):
+                jha['steps'][-1].setdefault('controls', []).append("Revised as requested")
+            return StubResponse(json.dumps(jha))
+
+        return StubResponse(f"```json\n{json.dumps(STUB_JHA, indent=2)}\n```")
+
+
+class BoundStubModel:
+    """A StubModel with system instructions attached"""
+
+    def __init__(self, stub, system_instruction, tokens_per_call):
+        self.stub = stub
+        self.system_instruction = system_instruction
+        self.tokens_per_call = tokens_per_call
+
+    def generate_content(self, prompt):
+        return self.stub.generate_content(prompt, self.tokens_per_call)
+
+    async def generate_content_async(self, prompt):
+        return await self.stub.generate_content_async(prompt, self.tokens_per_call)
@@ -0,0 +1,73 @@
+import json
+
+from jha_model import JHA
+
+JHA_DICT = {
+    "steps": [
+        {
+            "description": "Isolate FW pump 2",
+            "hazards": {
+                "potential_hazards": "Stored energy",
+                "who_affected": "Engineers",
+                "how_occurs": "Pump restarted during work"
+            },
+            "controls": ["LOTO Procedure", "Required PPE as per PPE Matrix REF-1412"],
+            "risk_level": {"consequence": 4, "likelihood": 2},
+            "step_number": 1
+        },
+        {
+            "description": "Replace impeller",
+            "hazards": {"potential_hazards": "Crushed fingers", "who_affected": "Fitter", "how_occurs": "Dropped casing"},
+            "controls": ["Lifting gear inspected"],
+            "risk_level": {"consequence": 2.5, "likelihood": "High"}
+        }
+    ],
+    "permits_required": ["Isolation Permit (LOTO)"],
+    "special_considerations": {"work_type_specific": "Verify zero energy state before work"},
+    "location": "Engine Room",
+    "jha_reference": "JHA-2024-001"
+}
+
+
+def test_dict_round_trip_keeps_extra_fields():
+    jha = JHA.from_dict(JHA_DICT)
+    assert jha.extra == {"jha_reference": "JHA-2024-001"}
+    assert jha.steps[0].extra == {"step_number": 1}
+    restored = JHA.from_dict(jha.to_dict())
+    assert restored.steps[0] == jha.steps[0]
+    assert restored.extra == jha.extra
+    # to_dict writes the levels that were taken, so they read back without problems
+    assert (restored.steps[1].consequence, restored.steps[1].likelihood) == (3, 5)
+    assert restored.steps[1].risk_problems == ()
+    assert jha.to_dict()["jha_reference"] == "JHA-2024-001"
+    assert jha.to_dict()["steps"][0]["step_number"] == 1
+
+
+def test_bytes_round_trip_keeps_extra_fields_and_risk_problems():
+    jha = JHA.from_dict(JHA_DICT)
+    restored = JHA.from_bytes(jha.to_bytes())
+    assert restored == jha
+    assert restored.steps[1].risk_problems == jha.steps[1].risk_problems
+    assert JHA.risk_levels_from_bytes(jha.to_bytes()) == (bytes((4, 3)), bytes((2, 5)))
+
+
+def test_unusable_risk_values_are_flagged():
+    step = JHA.from_dict(JHA_DICT).steps[1]
+    assert (step.consequence, step.likelihood) == (3, 5)
+    assert step.risk_problems == (
+        "consequence 2.5 is not a whole number from 1 to 5, taken as 3",
+        "likelihood 'High' is not a number from 1 to 5"
+    )
+
+
+def test_infinite_risk_values_are_taken_as_most_severe():
+    data = json.loads('{"steps": [{"risk_level": {"consequence": Infinity, "likelihood": 1e400}}]}')
+    step = JHA.from_dict(data).steps[0]
+    assert (step.consequence, step.likelihood) == (5, 5)
+    assert len(step.risk_problems) == 2
+
+
+def test_missing_risk_values_are_flagged():
+    step = JHA.from_dict({"steps": [{"description": "Toolbox Talk"}]}).steps[0]
+    assert (step.consequence, step.likelihood) == (5, 5)
+    assert step.risk_problems == ("consequence is missing", "likelihood is missing")
@@ -0,0 +1,81 @@
+from datetime import date
+
+import pytest
+
+from jha_model import JHA
+from jha_store import JHAStore
+from scheduler import MaintenanceTask, PregeneratedIndex, add_interval, due_dates, parse_interval
+
+
+@pytest.mark.parametrize("text, category", [
+    ("daily", "daily"),
+    ("Every 24 hours", "daily"),
+    ("weekly", "weekly"),
+    ("Monthly", "monthly"),
+    ("3-monthly", "quarterly"),
+    ("6-monthly", "semi_annual"),
+    ("six monthly", "semi_annual"),
+    ("Semi-annual", "semi_annual"),
+    ("yearly", "annual"),
+    ("12 months", "annual"),
+    ("2 yearly", "two_yearly"),
+    ("24 months", "two_yearly"),
+    ("5 yearly", "five_yearly"),
+    ("five-yearly", "five_yearly"),
+])
+def test_parse_interval(text, category):
+    assert parse_interval(text) == category
+
+
+@pytest.mark.parametrize("text", ["2 weekly", "every 4 months", "fortnightly"])
+def test_parse_interval_rejects_intervals_it_cannot_read_exactly(text):
+    with pytest.raises(ValueError):
+        parse_interval(text)
+
+
+@pytest.mark.parametrize("start, category, expected", [
+    (date(2024, 1, 31), "monthly", date(2024, 2, 29)),
+    (date(2023, 1, 31), "monthly", date(2023, 2, 28)),
+    (date(2024, 8, 31), "semi_annual", date(2025, 2, 28)),
+    (date(2024, 11, 30), "quarterly", date(2025, 2, 28)),
+    (date(2024, 2, 29), "annual", date(2025, 2, 28)),
+    (date(2024, 12, 31), "daily", date(2025, 1, 1)),
+    (date(2024, 12, 28), "weekly", date(2025, 1, 4)),
+])
+def test_add_interval(start, category, expected):
+    assert add_interval(start, category) == expected
+
+
+def task(interval, last_done=None):
+    return MaintenanceTask("T1", "Pump check", "Check FW pump", interval, "Engine Room", ("LOTO",), last_done)
+
+
+def test_due_dates_follow_the_interval_from_last_done():
+    dates = due_dates(task("weekly", date(2024, 5, 1)), date(2024, 5, 3), date(2024, 5, 31))
+    assert dates == [date(2024, 5, 8), date(2024, 5, 15), date(2024, 5, 22), date(2024, 5, 29)]
+
+
+def test_due_dates_start_now_for_new_and_overdue_tasks():
+    start, end = date(2024, 5, 3), date(2024, 5, 5)
+    assert due_dates(task("daily"), start, end) == [date(2024, 5, 3), date(2024, 5, 4), date(2024, 5, 5)]
+    assert due_dates(task("monthly", date(2024, 1, 1)), start, end) == [date(2024, 5, 3)]
+
+
+def test_due_dates_return_to_the_month_end_after_clamping():
+    dates = due_dates(task("monthly", date(2024, 1, 31)), date(2024, 2, 1), date(2024, 5, 31))
+    assert dates == [date(2024, 2, 29), date(2024, 3, 31), date(2024, 4, 30), date(2024, 5, 31)]
+
+
+def test_pregenerated_jhas_are_offered_on_their_own_vessel(tmp_path):
+    store = JHAStore(str(tmp_path / "pregenerated.bin"))
+    index = PregeneratedIndex(store)
+    for created, vessel in enumerate(("Vessel A", "Vessel B", "")):
+        store.save(JHA(), jha_id=f"T-{vessel}:digest", vessel_name=vessel, task_name="Pump check", created=created)
+
+    assert [r.vessel_name for r in index.find("vessel a", " Pump Check ")] == ["", "Vessel A"]
+    assert [r.vessel_name for r in index.find("Vessel C", "Pump check")] == [""]
+    assert index.find("Vessel A", "Davit service") == []
+
+    # A plan change replaces the task's JHA
+    store.save(JHA(), jha_id="T-Vessel A:changed", vessel_name="Vessel A", task_name="Pump check", created=3)
+    assert [r.jha_id for r in index.find("Vessel A", "Pump check")] == ["T-Vessel A:changed", "T-:digest"]
@@ -0,0 +1,93 @@
+from jha_model import JHA, Hazard, Step
+from validator import MANDATORY_STEPS, validate_jha
+
+PLANNING = Step("Job Planning - Daily Work Planning Meeting (RTHB Page 13)")
+TAKE_5 = Step("Take-5 Assessment (RTHB Page 16)")
+TOOLBOX = Step("Toolbox Talk (RTHB Page 16)")
+
+
+def descriptions(result):
+    return [step.description for step in result.jha.steps]
+
+
+def validate(*steps):
+    return validate_jha(JHA(steps=steps))
+
+
+def test_mandatory_steps_in_order_are_kept():
+    result = validate(PLANNING, TAKE_5, TOOLBOX, Step("Isolate pump"))
+    assert descriptions(result) == [PLANNING.description, TAKE_5.description, TOOLBOX.description, "Isolate pump"]
+    assert not any("mandatory" in fix for fix in result.fixes)
+
+
+def test_mandatory_steps_near_the_start_are_reordered():
+    result = validate(TOOLBOX, PLANNING, TAKE_5, Step("Isolate pump"))
+    assert descriptions(result)[:4] == [PLANNING.description, TAKE_5.description, TOOLBOX.description, "Isolate pump"]
+    assert "Moved the mandatory steps to the start of the JHA in the required order" in result.fixes
+
+
+def test_task_step_mentioning_toolbox_is_not_moved():
+    steps = (PLANNING, TAKE_5, Step("Isolate pump"), Step("Replace impeller"), Step("Test pump"),
+             Step("Return toolbox to store"))
+    result = validate(*steps)
+    assert descriptions(result) == [
+        PLANNING.description, TAKE_5.description, MANDATORY_STEPS[2][1].description,
+        "Isolate pump", "Replace impeller", "Test pump", "Return toolbox to store"
+    ]
+    assert f"Inserted the mandatory step '{MANDATORY_STEPS[2][1].description}'" in result.fixes
+
+
+def test_late_mandatory_step_is_inserted_not_moved():
+    steps = (PLANNING, Step("Isolate pump"), Step("Drain casing"), Step("Replace impeller"), Step("Refill casing"),
+             TOOLBOX, Step("Test pump"))
+    result = validate(*steps)
+    assert descriptions(result)[:3] == [step.description for _, step in MANDATORY_STEPS]
+    assert descriptions(result)[-2:] == [TOOLBOX.description, "Test pump"]
+
+
+def test_keyword_alone_does_not_count_as_mandatory_step():
+    result = validate(Step("Planning of lift"), Step("Take 5 minutes to ventilate"), Step("Open toolbox"))
+    assert descriptions(result)[:3] == [step.description for _, step in MANDATORY_STEPS]
+    assert descriptions(result)[3:] == ["Planning of lift", "Take 5 minutes to ventilate", "Open toolbox"]
+
+
+ENGINE_ROOM = {"hazards": ["Noise exposure", "Hot surfaces", "Moving machinery"]}
+
+
+def with_hazards(*hazards):
+    steps = [PLANNING, TAKE_5, TOOLBOX]
+    steps += [Step(f"Task step {i}", Hazard(potential_hazards=hazard)) for i, hazard in enumerate(hazards, 1)]
+    return JHA(steps=tuple(steps))
+
+
+def test_location_hazards_match_their_usual_wordings():
+    jha = with_hazards("High noise levels from running generators", "Burns from hot exhaust pipes",
+                       "Entanglement in rotating shaft")
+    result = validate_jha(jha, location="Engine Room", location_info=ENGINE_ROOM)
+    assert not any("hazard" in issue for issue in result.issues)
+
+
+def test_missing_location_hazard_is_reported():
+    jha = with_hazards("Burns from hot exhaust pipes", "Entanglement in rotating shaft")
+    result = validate_jha(jha, location="Engine Room", location_info=ENGINE_ROOM)
+    assert result.issues == ["The Engine Room hazard 'Noise exposure' is not identified in the hazards of any step"]
+
+
+def test_unknown_location_hazard_matches_its_key_phrase():
+    location_info = {"hazards": ["Slippery deck"]}
+    assert not validate_jha(with_hazards("Slippery deck after washing"), location="Deck", location_info=location_info).issues
+    assert validate_jha(with_hazards("Wet surfaces"), location="Deck", location_info=location_info).issues
+
+
+def test_fixes_keep_unknown_fields():
+    jha = JHA.from_dict({
+        "steps": [{"step_number": 1, "description": "Isolate pump", "notes": "Check drawings"}],
+        "permits_required": [],
+        "special_considerations": {},
+        "jha_reference": "JHA-2024-001"
+    })
+    result = validate_jha(jha, work_types=["LOTO"])
+    assert result.fixes
+    assert result.jha.extra == {"jha_reference": "JHA-2024-001"}
+    assert result.jha.to_dict()["jha_reference"] == "JHA-2024-001"
+    assert any((step.extra or {}).get("notes") == "Check drawings" for step in result.jha.steps)
@@ -0,0 +1,168 @@
+"""Translation of finished JHAs into crew languages
+
+Every text in a JHA is split into line segments. Translations are kept in a
+persistent translation memory keyed by the SHA-256 of language and segment,
+so repeated controls and hazards are translated once. Only segments missing
+from the memory are sent to the model, in a single batched call.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+
+from jha_model import JHA
+from jha_store import DATA_DIR
+
+TRANSLATION_MEMORY_PATH = os.path.join(DATA_DIR, "translation_memory.sqlite3")
+
+# Crew languages offered in the UI
+CREW_LANGUAGES = [
+    "Norwegian", "Polish", "Filipino (Tagalog)", "Russian",
+    "Ukrainian", "Spanish", "Portuguese", "Indonesian"
+]
+
+# Leading bullet or numbering and surrounding whitespace are kept out of segments;
+# they must be followed by whitespace, so "10.5 bar" or "-5 °C" stay whole
+_SEGMENT = re.compile(r"^(\s*(?:(?:[-•*]|\d+[.)])(?=\s))?\s*)(.*?)(\s*)$")
+
+
+def segment_key(language, segment):
+    return hashlib.sha256(f"{language}\0{segment}".encode("utf-8")).hexdigest()
+
+
+class TranslationMemory:
+    """Persistent segment translations stored in SQLite"""
+
+    def __init__(self, path=TRANSLATION_MEMORY_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "key TEXT PRIMARY KEY, language TEXT, source TEXT, target TEXT)"
+        )
+        self._db.commit()
+
+    def lookup(self, language, segments):
+        """Get the known translations of segments as {segment: translation}"""
+        keys = {segment_key(language, s): s for s in segments}
+        found = {}
+        with self._lock:
+            items = list(keys)
+            # Stay under SQLite's bound parameter limit
+            for i in range(0, len(items), 500):
+                batch = items[i:i + 500]
+                rows = self._db.execute(
+                    f"SELECT key, target FROM translations WHERE key IN ({','.join('?' * len(batch))})",
+                    batch
+                )
+                for key, target in rows:
+                    found[keys[key]] = target
+        return found
+
+    def add(self, language, translations):
+        """Store {segment: translation} pairs"""
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO translations (key, language, source, target) VALUES (?, ?, ?, ?)",
+                [(segment_key(language, s), language, s, t) for s, t in translations.items()]
+            )
+            self._db.commit()
+
+
+def _split(text):
+    """Split text into (prefix, segment, suffix) per line"""
+    return [_SEGMENT.match(line).groups() for line in text.split("\n")]
+
+
+def _map_texts(data, func):
+    """Apply func to every translatable string in a JHA dict, returning a new dict"""
+    def steps():
+        for step in data.get('steps', []):
+            # Fields other than the texts, such as ones the data model doesn't know, are kept
+            yield {
+                **step,
+                "description": func(step['description']),
+                "hazards": {key: func(value) for key, value in step['hazards'].items()},
+                "controls": [func(control) for control in step['controls']],
+                "risk_level": step['risk_level']
+            }
+
+    considerations = data.get('special_considerations', {})
+    if isinstance(considerations, dict):
+        considerations = {key: func(value) for key, value in considerations.items()}
+    elif isinstance(considerations, list):
+        considerations = [func(value) for value in considerations]
+    else:
+        considerations = func(considerations)
+
+    translated = dict(data)
+    translated['steps'] = list(steps())
+    translated['permits_required'] = [func(permit) for permit in data.get('permits_required', [])]
+    translated['special_considerations'] = considerations
+    return translated
+
+
+def _parse_array(response_text):
+    """Extract a JSON array from a model response"""
+    response_text = response_text.strip()
+    if "```" in response_text:
+        response_text = response_text.split("```")[1].removeprefix("json").strip()
+    start_idx = response_text.find('[')
+    end_idx = response_text.rfind(']')
+    if start_idx != -1 and end_idx != -1:
+        response_text = response_text[start_idx:end_idx + 1]
+    return json.loads(response_text)
+
+
+def translate_segments(segments, language, model):
+    """Translate a list of segments in one model call"""
+    prompt = f"""Translate each of the following Job Hazard Analysis text segments from English to {language}.
+
+Rules:
+- Keep document references such as "PPE Matrix REF-1412" and "RTHB Page 16" unchanged
+- Keep equipment tags, numbers and units unchanged
+- Use the safety terminology a ship's crew would use
+
+Return ONLY a JSON array of translated segments, in the same order, with exactly {len(segments)} strings.
+
+Segments:
+{json.dumps(segments, ensure_ascii=False, indent=2)}"""
+
+    translations = _parse_array(model.generate_content(prompt).text)
+    if not isinstance(translations, list) or len(translations) != len(segments):
+        raise ValueError("Translation response did not match the requested segments")
+    return [str(t) for t in translations]
+
+
+def translate_jha(jha, language, model, memory):
+    """Translate a JHA, returning (translated JHA, number of segments sent to the model)"""
+    data = JHA.coerce(jha).to_dict()
+
+    # Collect the unique segments in the JHA
+    segments = {}
+    def collect(text):
+        for _, segment, _ in _split(text):
+            if segment:
+                segments.setdefault(segment, None)
+        return text
+    _map_texts(data, collect)
+
+    # Look up the memory and send the rest in one batch
+    known = memory.lookup(language, segments)
+    missing = [s for s in segments if s not in known]
+    if missing:
+        new = dict(zip(missing, translate_segments(missing, language, model)))
+        memory.add(language, new)
+        known.update(new)
+
+    def translate(text):
+        return "\n".join(
+            prefix + known.get(segment, segment) + suffix
+            for prefix, segment, suffix in _split(text)
+        )
+
+    return JHA.from_dict(_map_texts(data, translate)), len(missing)
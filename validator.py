@@ -0,0 +1,267 @@
+"""Local rule-based JHA validator
+
+Checks a JHA against the safety rules the prompt asks for and against the
+work type and location requirements the app derives for the task:
+
+- the first three steps are the mandatory planning, Take-5 and Toolbox Talk steps
+- PPE controls cite "PPE Matrix REF-1412"
+- every required role (such as the Isolation Officer for LOTO), procedure,
+  piece of equipment, control and consideration is mentioned
+- the permits for the work types and location are listed
+- hot work identifies fire risk and location hazards are identified, in any
+  of their usual wordings
+- no internal code files are referenced
+
+Deterministic problems are fixed in place. Problems that need judgement, such
+as which step a hazard belongs to, are returned as issues for the model.
+All patterns are compiled once, so a check takes microseconds.
+"""
+import re
+import sys
+from dataclasses import dataclass, field, replace
+
+from jha_model import JHA, Hazard, Step
+
+PPE_REFERENCE = "PPE Matrix REF-1412"
+
+# The mandatory first steps in order, as (pattern recognising the step, step inserted when missing)
+MANDATORY_STEPS = (
+    (
+        re.compile(r"daily\s+work\s+planning", re.IGNORECASE),
+        Step(
+            "Job Planning - Daily Work Planning Meeting (RTHB Page 13)",
+            Hazard("Inadequate planning", "All personnel involved", "Hazards not identified before work starts"),
+            ("Daily Work Planning Meeting held (RTHB Page 13)",),
+            2, 2
+        )
+    ),
+    (
+        re.compile(r"take[\s-]*(?:5|five)\s+assessment", re.IGNORECASE),
+        Step(
+            "Take-5 Assessment (RTHB Page 16)",
+            Hazard("Changed conditions at the worksite", "Work team", "Conditions differ from the plan"),
+            ("Take-5 completed by each team member (RTHB Page 16)",),
+            2, 1
+        )
+    ),
+    (
+        re.compile(r"tool\s*box\s+talk", re.IGNORECASE),
+        Step(
+            "Toolbox Talk (RTHB Page 16)",
+            Hazard("Miscommunication", "Work team", "Roles and hazards not understood"),
+            ("Toolbox Talk held at the worksite (RTHB Page 16)",),
+            2, 1
+        )
+    )
+)
+
+# Mandatory steps are only looked for among the first steps; later steps that
+# mention them, such as "Return toolbox to store", are task steps
+MANDATORY_SEARCH_STEPS = 5
+
+# Permit required for each work type, with the pattern that recognises it in permits_required
+WORK_TYPE_PERMITS = {
+    "Hot Work": ("Hot Work Permit", re.compile(r"hot\s*work", re.IGNORECASE)),
+    "Cold Work": ("Cold Work Permit", re.compile(r"cold\s*work", re.IGNORECASE)),
+    "Enclosed Space Entry": ("Enclosed Space Entry Permit", re.compile(r"enclosed|confined", re.IGNORECASE)),
+    "Working Aloft": ("Working Aloft Permit", re.compile(r"aloft|at\s*height", re.IGNORECASE)),
+    "Overside": ("Overside Work Permit", re.compile(r"overside", re.IGNORECASE)),
+    "LOTO": ("Isolation Permit (LOTO)", re.compile(r"isolation|loto|lock[\s-]*out", re.IGNORECASE))
+}
+
+# Permit for locations whose access requirements include one
+LOCATION_PERMITS = {
+    "Tank Entry": "Enclosed Space Entry Permit"
+}
+
+# Patterns recognising each location hazard the app lists, including the usual
+# ways the model words them; other hazards are matched by their key phrase
+LOCATION_HAZARDS = {
+    "Noise exposure": re.compile(r"noise|noisy|loud|hearing", re.IGNORECASE),
+    "Hot surfaces": re.compile(
+        r"hot\s+(?:surface|pipe|part|component|exhaust|engine|metal)s?|burns?\b|high\s+temperature", re.IGNORECASE
+    ),
+    "Moving machinery": re.compile(
+        r"moving\s+(?:machinery|parts?|equipment)|rotating|entangle|caught\s+(?:in|between)|crush", re.IGNORECASE
+    ),
+    "Oxygen deficiency": re.compile(r"oxygen|\bo2\b|asphyxia", re.IGNORECASE),
+    "Toxic atmosphere": re.compile(
+        r"toxic|\bh2s\b|hydrogen\s+sulphide|carbon\s+monoxide|\bgas(?:es)?\b|fumes|vapou?rs?", re.IGNORECASE
+    ),
+    "Confined space": re.compile(r"confined|enclosed\s+space|restricted\s+(?:access|space)", re.IGNORECASE),
+    "Working over water": re.compile(
+        r"over\s*(?:water|side|board)|drown|(?:fall(?:ing)?|falls)\s+into\s+(?:the\s+)?(?:water|sea)", re.IGNORECASE
+    ),
+    "Fall hazard": re.compile(r"\bfall(?:s|ing)?\b|height", re.IGNORECASE),
+    "Weather conditions": re.compile(r"weather|wind|sea\s+state|swell|waves|rain|\bice\b|icy", re.IGNORECASE)
+}
+
+# Control added when a required role is not mentioned
+ROLE_CONTROLS = {
+    "Isolation Officer": "Isolation Officer appointed to verify and sign off all isolations"
+}
+
+_HOT_WORK = re.compile(r"hot\s*work|welding|cutting|grinding", re.IGNORECASE)
+_FIRE = re.compile(r"\bfires?\b|ignition|explosion|flammable", re.IGNORECASE)
+_PPE = re.compile(r"\bPPE\b|personal\s+protective", re.IGNORECASE)
+_PPE_REF = re.compile(r"REF[\s-]*1412", re.IGNORECASE)
+_CODE_FILE = re.compile(r"\b\w+\.py\b")
+
+
+@dataclass(slots=True)
+class ValidationResult:
+    jha: JHA
+    fixes: list = field(default_factory=list)
+    issues: list = field(default_factory=list)
+
+    @property
+    def ok(self):
+        return not self.issues
+
+
+def _key_phrase(requirement):
+    """The part of a requirement that identifies it, e.g. "LOTO Procedure" or "Fall arrest harness" """
+    return requirement.split(":")[0].split(" and ")[0].strip().lower()
+
+
+def _step_text(step):
+    hazards = step.hazards
+    return "\n".join((step.description, hazards.potential_hazards, hazards.who_affected,
+                      hazards.how_occurs, *step.controls)).lower()
+
+
+def _considerations_text(considerations):
+    if isinstance(considerations, dict):
+        return "\n".join(considerations.values())
+    if isinstance(considerations, (list, tuple)):
+        return "\n".join(considerations)
+    return considerations or ""
+
+
+def _add_consideration(considerations, text):
+    """Add a consideration, keeping the dict/list/str shape of special_considerations"""
+    text = sys.intern(text)
+    if isinstance(considerations, dict):
+        considerations = dict(considerations)
+        existing = considerations.get("work_type_specific", "")
+        considerations["work_type_specific"] = f"{existing}\n{text}" if existing else text
+        return considerations
+    if isinstance(considerations, (list, tuple)):
+        return (*considerations, text)
+    return f"{considerations}\n{text}" if considerations else {"work_type_specific": text}
+
+
+def _mandatory_steps(steps, fixes):
+    """Put the mandatory steps first, reordering those near the start and inserting missing ones"""
+    head, found = [], []
+    for pattern, default in MANDATORY_STEPS:
+        index = next((i for i, step in enumerate(steps[:MANDATORY_SEARCH_STEPS])
+                      if i not in found and pattern.search(step.description)), None)
+        if index is None:
+            head.append(default)
+            fixes.append(f"Inserted the mandatory step '{default.description}'")
+        else:
+            head.append(steps[index])
+            found.append(index)
+    if found != list(range(len(found))):
+        fixes.append("Moved the mandatory steps to the start of the JHA in the required order")
+    return head + [step for i, step in enumerate(steps) if i not in found]
+
+
+def validate_jha(jha, work_types=(), location=None, requirements=None, location_info=None):
+    """Check a JHA, returning a ValidationResult with the fixed JHA and the unresolved issues
+
+    requirements and location_info are the outputs of get_work_type_requirements
+    and get_location_requirements for the task.
+    """
+    jha = JHA.coerce(jha)
+    requirements = requirements or {}
+    location_info = location_info or {}
+    fixes, issues = [], []
+
+    steps = _mandatory_steps(list(jha.steps), fixes)
+    permits = list(jha.permits_required)
+    considerations = jha.special_considerations
+
+    # Controls for requirements that no step mentions go into the first task step
+    if len(steps) <= 3:
+        issues.append("The JHA has no task-specific steps after the three mandatory steps")
+    target = min(3, len(steps) - 1)
+    text = "\n".join(_step_text(step) for step in steps)
+
+    def add_control(control, reason):
+        nonlocal text
+        step = steps[target]
+        steps[target] = replace(step, controls=(*step.controls, sys.intern(control)))
+        text += "\n" + control.lower()
+        fixes.append(f"{reason}: added '{control}' to step {target + 1}")
+
+    for role in requirements.get("roles", []):
+        if role.lower() not in text:
+            add_control(ROLE_CONTROLS.get(role, f"{role} appointed for the task"), f"Missing role {role}")
+    for requirement in (*requirements.get("procedures", []), *requirements.get("equipment", []),
+                        *location_info.get("controls", [])):
+        if _key_phrase(requirement) not in text:
+            add_control(requirement, "Missing requirement")
+
+    # Special considerations from the work types and location
+    considerations_text = _considerations_text(considerations).lower()
+    for consideration in (*requirements.get("special_considerations", []),
+                          *location_info.get("special_considerations", [])):
+        phrase = _key_phrase(consideration)
+        if phrase not in considerations_text and phrase not in text:
+            considerations = _add_consideration(considerations, consideration)
+            considerations_text += "\n" + consideration.lower()
+            fixes.append(f"Added the special consideration '{consideration}'")
+
+    # PPE must cite the PPE matrix
+    if not _PPE.search(text) and len(steps) > 3:
+        add_control(f"Required PPE as per {PPE_REFERENCE}", "No PPE control")
+    for i, step in enumerate(steps):
+        controls = tuple(
+            sys.intern(f"{control} ({PPE_REFERENCE})")
+            if _PPE.search(control) and not _PPE_REF.search(control) else control
+            for control in step.controls
+        )
+        if controls != step.controls:
+            steps[i] = replace(step, controls=controls)
+            fixes.append(f"Added the {PPE_REFERENCE} reference to PPE controls in step {i + 1}")
+
+    # Permits for the work types and location
+    required_permits = [
+        (permit, re.compile(re.escape(_key_phrase(permit).removesuffix(" permit")), re.IGNORECASE))
+        for permit in requirements.get("permits", [])
+    ]
+    required_permits += [WORK_TYPE_PERMITS[w] for w in work_types if w in WORK_TYPE_PERMITS]
+    if location and str(location_info.get("access_requirements", {}).get("permit", "")).lower() == "required":
+        permit = LOCATION_PERMITS.get(location, f"{location} Access Permit")
+        required_permits.append((permit, re.compile(re.escape(permit.removesuffix(" Permit")), re.IGNORECASE)))
+    for permit, pattern in required_permits:
+        if not any(pattern.search(p) for p in permits):
+            permits.append(sys.intern(permit))
+            fixes.append(f"Added the required permit '{permit}'")
+
+    # Hazards need judgement about which step they belong to - left to the model
+    hazards_text = "\n".join(f"{step.hazards.potential_hazards}\n{step.hazards.how_occurs}" for step in steps)
+    if any(_HOT_WORK.search(w) for w in work_types) and not _FIRE.search(hazards_text):
+        issues.append("Hot work is selected but no step identifies fire risk in its hazards")
+    for hazard in location_info.get("hazards", []):
+        pattern = LOCATION_HAZARDS.get(hazard)
+        if not (pattern.search(hazards_text) if pattern else _key_phrase(hazard) in hazards_text.lower()):
+            issues.append(f"The {location} hazard '{hazard}' is not identified in the hazards of any step")
+    for i, step in enumerate(steps, 1):
+        if step.risk_problems:
+            issues.append(f"Step {i} needs its risk re-assessed as whole numbers from 1 to 5: "
+                          + "; ".join(step.risk_problems))
+    for name in sorted(set(_CODE_FILE.findall(text))):
+        issues.append(f"The JHA references the internal code file '{name}'")
+
+    fixed = replace(jha, steps=tuple(steps), permits_required=tuple(permits),
+                    special_considerations=considerations) if fixes else jha
+    return ValidationResult(fixed, fixes, issues)
+
+
+def revision_request(issues):
+    """Chat-style revision message asking the model to resolve validator issues"""
+    return ("Fix these safety issues found by the JHA validator, changing nothing else:\n"
+            + "\n".join(f"- {issue}" for issue in issues))